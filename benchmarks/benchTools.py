@@ -0,0 +1,49 @@
+"""
+Timing and peak memory measurement shared by benchmark scripts
+"""
+
+import json
+import timeit
+import tracemalloc
+
+
+def measure(func, nRep=1):
+    """
+    return mean wall time of func in seconds and peak memory in bytes
+    allocated during one call, memory is measured in a separate call
+    since tracemalloc slows down execution
+    Inputs:
+    - func: callable without arguments
+    - nRep: int, number of timed calls
+    """
+    tCall = timeit.timeit(func, number=nRep) / nRep
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return tCall, peak
+
+
+def report(rows, columns, output=None):
+    """
+    print results as a table and optionally write them in a json file
+    Inputs:
+    - rows: list of dict, one per benchmark
+    - columns: list of str, keys printed in table
+    - output: str, json file, None to only print table
+    """
+    width = {col: max([12, len(col)] + [len(str(row[col])) for row in rows])
+             for col in columns}
+    print(" ".join(f"{col:>{width[col]}s}" for col in columns))
+    for row in rows:
+        cells = []
+        for col in columns:
+            value = row[col]
+            if isinstance(value, float):
+                cells.append(f"{value:>{width[col]}.3e}")
+            else:
+                cells.append(f"{value!s:>{width[col]}s}")
+        print(" ".join(cells))
+    if output is not None:
+        with open(output, "w") as f:
+            json.dump(rows, f, indent=2)
@@ -0,0 +1,69 @@
+"""
+Time fvEqn assembly and solve for each divergence scheme and
+boundary condition type, mesh sizes from 10^2 to 10^6 cells
+usage: python bench_assembly.py [--maxCells N] [--output results.json]
+"""
+
+import argparse
+import numpy as np
+
+from finVols1D import fv
+from finVols1D.runTime import runTime
+from finVols1D.fv.fvBoundaries import fvBC
+from finVols1D.fv.fvSchemes.divSchemes import divScheme
+from benchTools import measure, report
+
+
+def makeCase(nCells, bcType):
+    """return equation and fields of an advection diffusion problem"""
+    time = runTime({"startTime":0., "endTime":1., "dt":0.1, "dtSave":1.})
+    time.loop()  # previous time needed by ddt term
+    Xfaces = np.linspace(0., 1., nCells+1)
+    mesh = fv.fvMesh(Xfaces, time)
+    bcDict = {"type":bcType, "value":0.}
+    field = fv.fvField(
+        "C", mesh, time, bc0=bcDict, bcN=bcDict,
+        values=np.sin(2*np.pi*mesh.Xcells))
+    # velocity changing sign to test both flow directions
+    U = fv.fvField(
+        "U", mesh, time, bc0=bcDict, bcN=bcDict,
+        values=np.cos(2*np.pi*mesh.Xcells))
+    phi = fv.surfaceField("U", mesh, U)
+    diff = fv.fvField(
+        "D", mesh, time, bc0=bcDict, bcN=bcDict,
+        values=1e-3*np.ones(mesh.nCells))
+    diffFaces = fv.surfaceField("D", mesh, diff)
+    return fv.fvEqn(mesh), field, phi, diffFaces
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--maxCells", type=int, default=10**6)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    rows = []
+    nCellsList = [10**p for p in range(2, 7) if 10**p <= args.maxCells]
+    for scheme in divScheme.divSchemes_types:
+        for bcType in fvBC.BC_types:
+            for nCells in nCellsList:
+                eqn, field, phi, diffFaces = makeCase(nCells, bcType)
+
+                def assemble():
+                    eqn.reset()
+                    eqn.addDdt(field)
+                    eqn.addDiv(phi, field, scheme=scheme)
+                    # laplacian has no cyclic boundary correction
+                    if bcType != "cyclic":
+                        eqn.addLaplacian(diffFaces, field)
+
+                nRep = max(1, 10**5 // nCells)
+                tAssembly, memAssembly = measure(assemble, nRep)
+                tSolve, memSolve = measure(eqn.solve, nRep)
+                rows.append({
+                    "scheme": scheme, "bc": bcType, "nCells": nCells,
+                    "assembly (s)": tAssembly, "solve (s)": tSolve,
+                    "assembly peak (B)": memAssembly,
+                    "solve peak (B)": memSolve,
+                })
+    report(rows, list(rows[0].keys()), args.output)
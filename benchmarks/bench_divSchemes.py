@@ -0,0 +1,74 @@
+"""
+Compare array based divergence schemes with the former loop kernels
+assembled matrices must match, timings are printed for several mesh sizes
+"""
+
+import timeit
+import numpy as np
+
+from finVols1D import fv
+from finVols1D.runTime import runTime
+from finVols1D.fv.fvSchemes.divSchemes import divScheme
+
+
+# - - - REFERENCE LOOP KERNELS - - - #
+
+def upwindLoop(eqn, phi, field):
+    for i in range(1, field.mesh.nFaces-1):
+        if phi[i] >= 0:
+            eqn._Amat[i-1, i-1] += phi[i]
+            eqn._Amat[i, i-1] -= phi[i]
+        else:
+            eqn._Amat[i, i] -= phi[i]
+            eqn._Amat[i-1, i] += phi[i]
+
+
+def linearLoop(eqn, phi, field):
+    mesh = field.mesh
+    for i in range(1, mesh.nFaces-1):
+        eqn._Amat[i-1, i] += phi[i] * mesh.dX[i-1] / (mesh.dX[i] + mesh.dX[i-1])
+        eqn._Amat[i-1, i-1] += phi[i] * mesh.dX[i] / (mesh.dX[i] + mesh.dX[i-1])
+        eqn._Amat[i, i] -= phi[i] * mesh.dX[i-1] / (mesh.dX[i] + mesh.dX[i-1])
+        eqn._Amat[i, i-1] -= phi[i] * mesh.dX[i] / (mesh.dX[i] + mesh.dX[i-1])
+
+
+loopKernels = {
+    "upwind": upwindLoop,
+    "linear": linearLoop,
+    "linearUpwind": upwindLoop,  # explicit correction only in source vector
+}
+
+
+def makeCase(nCells):
+    time = runTime({"startTime":0., "endTime":1., "dt":0.1, "dtSave":1.})
+    Xfaces = np.cumsum(np.r_[0., 0.5 + np.random.rand(nCells)])
+    mesh = fv.fvMesh(Xfaces, time)
+    field = fv.fvField(
+        "C", mesh, time, values=np.sin(mesh.Xcells))
+    # velocity changing sign to test both flow directions
+    U = fv.fvField(
+        "U", mesh, time, values=np.cos(3*mesh.Xcells))
+    phi = fv.surfaceField("U", mesh, U)
+    return mesh, field, phi
+
+
+if __name__ == "__main__":
+    print(f"{'scheme':>14s} {'nCells':>8s} {'loop (s)':>10s} "
+          + f"{'array (s)':>10s} {'speedup':>8s} {'max diff':>10s}")
+    for nCells in (100, 1000, 10000):
+        mesh, field, phi = makeCase(nCells)
+        for name, loopKernel in loopKernels.items():
+            scheme = divScheme.create(name)
+            eqnLoop = fv.fvEqn(mesh)
+            eqnArr = fv.fvEqn(mesh)
+            nRep = max(1, 10000 // nCells)
+            tLoop = timeit.timeit(
+                lambda: (eqnLoop.reset(), loopKernel(eqnLoop, phi, field)),
+                number=nRep) / nRep
+            tArr = timeit.timeit(
+                lambda: (eqnArr.reset(), scheme.addDiv(eqnArr, phi, field)),
+                number=nRep) / nRep
+            diff = np.max(np.abs(
+                eqnLoop._Amat.toDense() - eqnArr._Amat.toDense()))
+            print(f"{name:>14s} {nCells:>8d} {tLoop:>10.2e} "
+                  + f"{tArr:>10.2e} {tLoop/tArr:>8.1f} {diff:>10.1e}")
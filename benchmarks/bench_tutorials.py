@@ -0,0 +1,207 @@
+"""
+Headless, fixed length versions of tutorial cases,
+same setup as tutorials without plots and prints
+usage: python bench_tutorials.py [--nSteps N] [--output results.json]
+each case checks that its fields stay finite, a diverged case is an error
+"""
+
+import argparse
+import numpy as np
+
+from finVols1D import fv
+from finVols1D.runTime import runTime
+from finVols1D import turbulenceModels
+from benchTools import measure, report
+
+
+def checkFinite(case, *fields):
+    """raise error if a field of a case is not finite"""
+    for field in fields:
+        if not np.isfinite(field.field).all():
+            raise ValueError(f"{case} case diverged, {field.name} is not finite")
+
+
+def channel(nSteps):
+    """
+    headless, fixed-length version of tutorials/channel.py, velocity
+    and suspended load in a channel, same forcing integrated over cells
+    and eddy viscosity kept positive as in the tutorial
+    """
+    Hwater, Uobj, nu = 0.1, 1., 1e-6
+    ws, csRef = -0.03, 0.3
+    time = runTime(
+        {"startTime":0., "endTime":nSteps*0.01, "dt":0.01,
+         "dtSave":nSteps*0.01})
+    mesh = fv.fvMesh(np.linspace(0., Hwater, 100), time)
+    Ufield = fv.fvField(
+        "U", mesh, time,
+        bc0={"type":"fixedValue", "value":0.},
+        bcN={"type":"fixedGradient", "value":0.},
+        values=np.zeros(mesh.nCells))
+    CsField = fv.fvField(
+        "Cs", mesh, time,
+        bc0={"type":"fixedGradient", "value":0.},
+        bcN={"type":"fixedGradient", "value":0.},
+        values=np.zeros(mesh.nCells))
+    WsField = fv.fvField(
+        "Ws", mesh, time,
+        bc0={"type":"fixedGradient", "value":0.},
+        bcN={"type":"fixedValue", "value":0.},
+        values=np.ones(mesh.nCells) * ws)
+    phiWs = fv.surfaceField("Ws", mesh, WsField)
+    turbulence = turbulenceModels.mixingLength(Ufield, length=Hwater, wall=0)
+    nut = fv.fvField(
+        "nut", mesh, time,
+        bc0={"type":"fixedGradient", "value":0.},
+        bcN={"type":"fixedGradient", "value":0.},
+        values=nu + np.abs(turbulence.nut()))
+    nutFaces = fv.surfaceField("nut", mesh, nut)
+    Usource = fv.fvField(
+        "F_Umean", mesh, time, values=np.ones(mesh.nCells) * Uobj)
+    diffSed = fv.fvField(
+        "diffSed", mesh, time,
+        bc0={"type":"fixedGradient", "value":0.},
+        bcN={"type":"fixedGradient", "value":0.},
+        values=nu + np.abs(turbulence.nut()))
+    diffSedFaces = fv.surfaceField("diffSed", mesh, diffSed)
+    csRefArr = np.zeros(mesh.nCells)
+    erosion = fv.fvField("erosion", mesh, time, values=csRefArr)
+    UEqn = fv.fvEqn(mesh)
+    CsEqn = fv.fvEqn(mesh)
+    while time.loop():
+        np.subtract(Uobj, Ufield, out=Usource)
+        Usource *= mesh.dX  # source is integrated over cells
+        UEqn.addDdt(Ufield)
+        UEqn.addLaplacian(nutFaces, Ufield)
+        UEqn.addSource(Usource)
+        Ufield.update(UEqn.solve())
+        UEqn.reset()
+        nut.update(nu + np.abs(turbulence.nut()))
+        nutFaces.update(nut)
+        diffSed.update(nut.field)
+        diffSedFaces.update(diffSed)
+        fv.fvTools.getGradCells(Ufield)
+        csRefArr[0] = csRef * np.abs(ws)
+        erosion.update(csRefArr)
+        CsEqn.addDdt(CsField)
+        CsEqn.addDiv(phiWs, CsField, scheme="linearUpwind")
+        CsEqn.addLaplacian(diffSedFaces, CsField)
+        CsEqn.addSource(erosion)
+        CsField.update(CsEqn.solve())
+        CsEqn.reset()
+    checkFinite("channel", Ufield, CsField)
+
+
+def rouseProfile(nSteps):
+    """tutorials/rouseProfile.py, stationary problem solved nSteps times"""
+    kappa, Hwater, uf, ws, csRef = 0.41, 0.1, 0.01, -0.01, 0.3
+    aRef = 0.05 * Hwater
+    time = runTime(
+        {"startTime":0., "endTime":10., "dt":0.02, "dtSave":10.})
+    mesh = fv.fvMesh(np.linspace(aRef, Hwater, 200), time)
+    CsField = fv.fvField(
+        "Cs", mesh, time,
+        bc0={"type":"fixedGradient", "value":0.},
+        bcN={"type":"fixedGradient", "value":0.},
+        values=np.zeros(mesh.nCells))
+    WsField = fv.fvField(
+        "Ws", mesh, time,
+        bc0={"type":"fixedGradient", "value":0.},
+        bcN={"type":"fixedValue", "value":0.},
+        values=np.ones(mesh.nCells) * ws)
+    phiWs = fv.surfaceField("Ws", mesh, WsField)
+    nut = fv.fvField(
+        "nut", mesh, time,
+        bc0={"type":"fixedValue", "value":0.},
+        bcN={"type":"fixedValue", "value":0.},
+        values=kappa * uf * mesh.Xcells * (1 - mesh.Xcells/Hwater))
+    nutFaces = fv.surfaceField("nut", mesh, nut)
+    CsEqn = fv.fvEqn(mesh)
+    csRefArr = np.zeros(mesh.nCells)
+    csRefArr[0] = csRef * np.abs(ws)
+    erosion = fv.fvField("erosion", mesh, time, values=csRefArr)
+    for _ in range(nSteps):
+        CsEqn.addDiv(phiWs, CsField)
+        CsEqn.addLaplacian(nutFaces, CsField)
+        CsEqn.addSource(erosion)
+        CsField.update(CsEqn.solve())
+        CsEqn.reset()
+    checkFinite("rouseProfile", CsField)
+
+
+def sedimBed(nSteps):
+    """tutorials/sedimBed.py, settling on a moving bed"""
+    ws, Hwater = -0.01, 0.1
+    time = runTime(
+        {"startTime":0., "endTime":nSteps*0.1, "dt":0.1,
+         "dtSave":nSteps*0.1})
+    mesh = fv.dynamicFvMesh(np.linspace(0., Hwater, 20), time)
+    CsField = fv.fvField(
+        "Cs", mesh, time,
+        bc0={"type":"fixedGradient", "value":0.},
+        bcN={"type":"fixedGradient", "value":0},
+        values=np.zeros(mesh.nCells) + 0.05)
+    wsField = fv.fvField(
+        "ws", mesh, time,
+        bc0={"type":"fixedGradient", "value":0.},
+        bcN={"type":"fixedValue", "value":0.},
+        values=ws * np.ones(mesh.nCells))
+    phiWs = fv.surfaceField("ws", mesh, wsField)
+    CsEqn = fv.fvEqn(mesh)
+    dzBed = 0.
+    while time.loop():
+        mesh.meshMotion(dzBed, 0.)
+        CsEqn.addDdt(CsField)
+        phiWs.makeRelative()
+        CsEqn.addDiv(phiWs, CsField, scheme="linearUpwind")
+        CsField.update(CsEqn.solve())
+        dzBed = -phiWs[0] * CsField[0] * time._dt
+        CsEqn.reset()
+    checkFinite("sedimBed", CsField)
+
+
+def burgersWave(nSteps):
+    """tutorials/burgers_wave.py, periodic inviscid Burgers equation"""
+    Lx = 1.
+    time = runTime(
+        {"startTime":0., "endTime":nSteps*0.001, "dt":0.001,
+         "dtSave":nSteps*0.001})
+    mesh = fv.fvMesh(np.linspace(0., Lx, 100), time)
+    Ufield = fv.fvField(
+        "u", mesh, time,
+        bc0={"type":"cyclic"},
+        bcN={"type":"cyclic"},
+        values=-1 + 0.2 * np.cos(2*np.pi * mesh.Xcells/Lx))
+    phiU = fv.surfaceField("u", mesh, Ufield)
+    UEqn = fv.fvEqn(mesh)
+    while time.loop():
+        UEqn.addDdt(Ufield)
+        UEqn.addDiv(phiU, Ufield)
+        Ufield.update(UEqn.solve())
+        phiU.update(Ufield)
+        UEqn.reset()
+    checkFinite("burgers_wave", Ufield)
+
+
+cases = {
+    "channel": channel,
+    "rouseProfile": rouseProfile,
+    "sedimBed": sedimBed,
+    "burgers_wave": burgersWave,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--nSteps", type=int, default=100)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    rows = []
+    for name, case in cases.items():
+        tCase, memCase = measure(lambda: case(args.nSteps), nRep=3)
+        rows.append({
+            "case": name, "nSteps": args.nSteps, "time (s)": tCase,
+            "time per step (s)": tCase / args.nSteps, "peak (B)": memCase,
+        })
+    report(rows, list(rows[0].keys()), args.output)
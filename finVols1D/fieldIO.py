@@ -0,0 +1,329 @@
+"""
+Write and read fields at save times
+results are stored in chunks of .npy files, one record per save time
+checkpoints of case state are stored in .npz files
+"""
+
+import os
+import json
+import shutil
+import numpy as np
+
+
+class fieldWriter:
+
+    def __init__(self, path, time, fields, mesh=None, chunkSize=100):
+        """
+        Fields are written by time.loop() every dtSave
+        Inputs:
+        - path: str, output directory
+        - time: runTime
+        - fields: list of fvField or surfaceField, names must be unique
+        - mesh: fvMesh, if given cell centers and faces are saved,
+            at each record for a dynamicFvMesh, once otherwise
+        - chunkSize: int, number of records kept in memory before writing
+        """
+        self._path = path
+        self._time = time
+        self._fields = {}
+        for field in fields:
+            if field.name in self._fields \
+               or field.name in ("time", "Xcells", "Xfaces"):
+                raise ValueError(
+                    f"field name {field.name} is used twice or reserved in fieldWriter")
+            self._fields[field.name] = field
+        self._mesh = mesh
+        self._movingMesh = hasattr(mesh, "meshMotion")
+        self._chunkSize = chunkSize
+        self._nRecords = 0  # number of records written on disk
+        self._nChunks = 0
+        os.makedirs(self._path, exist_ok=True)
+        # preallocated buffers for one chunk
+        self._buffers = {"time": np.zeros(chunkSize)}
+        for name, field in self._fields.items():
+            self._buffers[name] = np.zeros((chunkSize,) + self._values(field).shape)
+        if self._mesh is not None:
+            if self._movingMesh:
+                self._buffers["Xcells"] = np.zeros((chunkSize,) + mesh.Xcells.shape)
+                self._buffers["Xfaces"] = np.zeros((chunkSize,) + mesh.Xfaces.shape)
+            else:
+                np.save(os.path.join(self._path, "Xcells.npy"), mesh.Xcells)
+                np.save(os.path.join(self._path, "Xfaces.npy"), mesh.Xfaces)
+        self._iBuffer = 0  # number of records in buffers
+        self._writeHeader()
+        self._time.addWriter(self)
+
+
+    def _values(self, field):
+        """return array of values of fvField or surfaceField"""
+        if hasattr(field, "phi"):
+            return field.phi
+        return field.field
+
+
+    def write(self):
+        """store current state of fields in buffers"""
+        self._buffers["time"][self._iBuffer] = self._time.time
+        for name, field in self._fields.items():
+            self._buffers[name][self._iBuffer] = self._values(field)
+        if self._movingMesh:
+            self._buffers["Xcells"][self._iBuffer] = self._mesh.Xcells
+            self._buffers["Xfaces"][self._iBuffer] = self._mesh.Xfaces
+        self._iBuffer += 1
+        if self._iBuffer == self._chunkSize:
+            self.flush()
+
+
+    def flush(self):
+        """write buffered records to a new chunk on disk"""
+        if self._iBuffer == 0:
+            return
+        chunkDir = os.path.join(self._path, f"chunk_{self._nChunks:05d}")
+        os.makedirs(chunkDir, exist_ok=True)
+        for name, buf in self._buffers.items():
+            np.save(os.path.join(chunkDir, name + ".npy"), buf[:self._iBuffer])
+        self._nRecords += self._iBuffer
+        self._nChunks += 1
+        self._iBuffer = 0
+        self._writeHeader()
+
+
+    def close(self):
+        """write remaining records"""
+        self.flush()
+
+
+    def restart(self, nRecords, nChunks):
+        """
+        continue output of a restarted run, chunks written
+        after the checkpoint are removed
+        Inputs:
+        - nRecords: int, number of records on disk at checkpoint
+        - nChunks: int, number of chunks on disk at checkpoint
+        """
+        iChunk = nChunks
+        while os.path.isdir(os.path.join(self._path, f"chunk_{iChunk:05d}")):
+            shutil.rmtree(os.path.join(self._path, f"chunk_{iChunk:05d}"))
+            iChunk += 1
+        self._nRecords = nRecords
+        self._nChunks = nChunks
+        self._iBuffer = 0
+        self._writeHeader()
+
+
+    def _writeHeader(self):
+        header = {
+            "fields": list(self._fields.keys()),
+            "mesh": self._mesh is not None,
+            "movingMesh": self._movingMesh,
+            "nRecords": self._nRecords,
+            "nChunks": self._nChunks,
+        }
+        with open(os.path.join(self._path, "header.json"), "w") as f:
+            json.dump(header, f)
+
+
+class fieldReader:
+
+    def __init__(self, path):
+        """
+        Read results written by fieldWriter, records are loaded lazily
+        Inputs:
+        - path: str, output directory
+        """
+        self._path = path
+        with open(os.path.join(self._path, "header.json")) as f:
+            header = json.load(f)
+        self.fieldNames = header["fields"]
+        self._mesh = header["mesh"]
+        self._movingMesh = header["movingMesh"]
+        self._nChunks = header["nChunks"]
+        self.times = np.concatenate(
+            [self._load(i, "time") for i in range(self._nChunks)]) \
+            if self._nChunks > 0 else np.zeros(0)
+        # index of first record of each chunk
+        self._chunkStart = np.cumsum(
+            [0] + [len(self._load(i, "time")) for i in range(self._nChunks)])
+
+
+    def _load(self, iChunk, name):
+        return np.load(
+            os.path.join(self._path, f"chunk_{iChunk:05d}", name + ".npy"),
+            mmap_mode="r")
+
+
+    def __len__(self):
+        return len(self.times)
+
+
+    def read(self, name, index):
+        """
+        return values of a field at record index
+        Inputs:
+        - name: str, field name, or "Xcells", "Xfaces"
+        - index: int, record index
+        """
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"record {index} out of range")
+        if name in ("Xcells", "Xfaces"):
+            if not self._mesh:
+                raise ValueError("mesh was not saved")
+            if not self._movingMesh:
+                return np.load(os.path.join(self._path, name + ".npy"))
+        elif name not in self.fieldNames:
+            raise ValueError(f"field {name} not found in {self._path}")
+        iChunk = np.searchsorted(self._chunkStart, index, side="right") - 1
+        return np.array(self._load(iChunk, name)[index - self._chunkStart[iChunk]])
+
+
+    def readAll(self, name):
+        """return values of a field at all records, shape (nRecords, ...)"""
+        return np.array([self.read(name, i) for i in range(len(self))])
+
+
+class checkpoint:
+
+    def __init__(
+            self,
+            path,
+            time,
+            fields=(),
+            mesh=None,
+            equations=(),
+            interval=None
+    ):
+        """
+        Dump and reload full case state in a binary .npz file,
+        a run restarted from a checkpoint reproduces the original run
+        Inputs:
+        - path: str, checkpoint file
+        - time: runTime
+        - fields: list of fvField and surfaceField
+        - mesh: fvMesh, internal fields of dynamicFvMesh are included
+        - equations: list of fvEqn with cached factorization
+        - interval: int, number of iterations between checkpoints
+            written by time.loop(), None to write only on demand
+        """
+        self._path = path
+        self._time = time
+        self._fields = list(fields)
+        self._mesh = mesh
+        self._equations = list(equations)
+        if hasattr(mesh, "meshMotion"):
+            self._fields += [
+                mesh.dXc, mesh.fvDiff, mesh.diff, mesh.Umesh, mesh.phiMesh]
+            self._equations.append(mesh.eqn)
+        self._interval = interval
+        if interval is not None:
+            self._time.addCheckpoint(self)
+
+
+    def update(self):
+        """write checkpoint if iteration is a multiple of interval"""
+        if self._time._iter % self._interval == 0:
+            self.write()
+
+
+    def write(self):
+        """write case state, file is replaced only once fully written"""
+        state = {}
+        time = self._time
+        for name in ("time", "time_1", "time_2", "_iter", "_dt",
+                     "_dtCourant", "_iSave", "_nextSave", "_lastSave"):
+            if getattr(time, name) is not None:
+                state["runTime/" + name] = getattr(time, name)
+        # output written so far, buffered records are flushed first
+        for i, writer in enumerate(time._writers):
+            writer.flush()
+            state[f"writer/{i}/nRecords"] = writer._nRecords
+            state[f"writer/{i}/nChunks"] = writer._nChunks
+        for i, field in enumerate(self._fields):
+            key = f"field/{i}/"
+            state[key + "name"] = field.name
+            for name in ("field", "field0", "field00", "phi"):
+                if getattr(field, name, None) is not None:
+                    state[key + name] = getattr(field, name)
+            if hasattr(field, "bc0"):
+                for side in ("bc0", "bcN"):
+                    bc = getattr(field, side)
+                    if hasattr(bc, "_value"):
+                        state[key + side] = bc._value
+        if self._mesh is not None:
+            for name in ("Xfaces", "Xcells", "dX", "dX0", "dX00"):
+                state["mesh/" + name] = getattr(self._mesh, name)
+        for i, eqn in enumerate(self._equations):
+            if eqn._AmatFactor is not None:
+                key = f"eqn/{i}/"
+                state[key + "matrix"] = eqn._AmatFactor.name
+                for j, arr in enumerate(eqn._AmatFactor._arrays()):
+                    state[key + str(j)] = arr
+        tmpPath = self._path + ".tmp.npz"
+        np.savez(tmpPath, **state)
+        os.replace(tmpPath, self._path)
+
+
+    def read(self):
+        """restore case state from checkpoint file"""
+        from finVols1D.fv.fvMatrices import fvMatrix
+        with np.load(self._path) as data:
+            state = {key: data[key] for key in data.files}
+        time = self._time
+        for name in ("time", "time_1", "time_2", "_iter", "_dt",
+                     "_dtCourant", "_iSave", "_nextSave", "_lastSave"):
+            value = state.get("runTime/" + name)
+            setattr(time, name, None if value is None else value.item())
+        for i, writer in enumerate(time._writers):
+            writer.restart(
+                int(state[f"writer/{i}/nRecords"]),
+                int(state[f"writer/{i}/nChunks"]))
+        for i, field in enumerate(self._fields):
+            key = f"field/{i}/"
+            if str(state[key + "name"]) != field.name:
+                raise ValueError(
+                    f"checkpoint field {state[key + 'name']} does not match "
+                    + f"field {field.name}")
+            # values are copied in existing arrays, views held by fvState
+            # or by other objects stay valid after restart
+            for name in ("field", "field0", "field00", "phi"):
+                if not hasattr(field, name):
+                    continue
+                value = state.get(key + name)
+                current = getattr(field, name)
+                if value is None or current is None:
+                    setattr(field, name, value)
+                else:
+                    np.copyto(current, value)
+            field._version += 1
+            for side in ("bc0", "bcN"):
+                value = state.get(key + side)
+                if value is not None:
+                    bc = getattr(field, side)
+                    if isinstance(bc._value, np.ndarray) \
+                            and bc._value.shape == value.shape:
+                        np.copyto(bc._value, value)
+                    else:
+                        bc._value = \
+                            value.item() if value.ndim == 0 else np.copy(value)
+                    bc._version += 1
+        if self._mesh is not None:
+            for name in ("Xfaces", "Xcells", "dX", "dX0", "dX00"):
+                getattr(self._mesh, name)[...] = state["mesh/" + name]
+            self._mesh._getMetrics()
+            self._mesh._version += 1
+        for i, eqn in enumerate(self._equations):
+            key = f"eqn/{i}/"
+            eqn._factor = None
+            eqn._AmatFactor = None
+            if key + "matrix" in state:
+                Amat = fvMatrix.create(
+                    str(state[key + "matrix"]), eqn._mesh.nCells,
+                    eqn._mesh.Xcells.shape[:-1])
+                for j, arr in enumerate(Amat._arrays()):
+                    arr[...] = state[key + str(j)]
+                eqn._AmatFactor = Amat
+                if eqn._solver is None:
+                    eqn._factor = Amat.factorize()
+                else:
+                    eqn._factor = eqn._solver.factorize(Amat)
@@ -1,4 +1,9 @@
 from .fvFields import fvField, surfaceField
 from .fvMesh import fvMesh, dynamicFvMesh
-from .fvEquations import fvEqn
+from .fvEquations import fvEqn, fvEqnTemplate
+from .fvCoupled import fvCoupledEqn
+from .fvNonlinear import fvNonlinearSolver
+from .fvExplicit import fvExplicitSolver
+from .fvBatch import batchFvMesh, batchFvField
+from .fvState import fvState
 from .fvSchemes import divSchemes
@@ -0,0 +1,48 @@
+"""
+Batch of independent 1D columns solved at once
+arrays have shape (nColumns, nCells) or (nColumns, nFaces)
+"""
+
+import numpy as np
+from .fvMesh import fvMesh
+from .fvFields import fvField
+
+
+class batchFvMesh(fvMesh):
+
+    def __init__(self, Xfaces, time, nColumns=None):
+        """
+        Inputs:
+        - Xfaces: ndarray, mesh faces coordinates, shape (nColumns, nFaces)
+            or (nFaces,) if all columns share the same faces
+        - time: runTime
+        - nColumns: int, number of columns, needed if Xfaces is 1D
+        """
+        Xfaces = np.asarray(Xfaces, dtype=float)
+        if Xfaces.ndim == 1:
+            if nColumns is None:
+                raise ValueError(
+                    "nColumns must be given when Xfaces has shape (nFaces,)")
+            Xfaces = np.tile(Xfaces, (nColumns, 1))
+        elif Xfaces.ndim != 2:
+            raise ValueError(
+                "Xfaces has shape different from (nFaces,) or (nColumns, nFaces)"
+                + f"\n Xfaces.shape = {Xfaces.shape}")
+        self.nColumns = Xfaces.shape[0]
+        super(batchFvMesh, self).__init__(Xfaces, time)
+
+
+class batchFvField(fvField):
+    """
+    fvField defined on a batchFvMesh, field has shape (nColumns, nCells)
+    boundary condition values may be floats or arrays of shape (nColumns,)
+    """
+
+    def _initialize(self, values):
+        if np.all(values)!=None:
+            try:
+                self.field = np.broadcast_to(values, self.field.shape)
+            except ValueError:
+                raise ValueError(
+                    "values can not be broadcast to (nColumns, nCells)"
+                    + f"\n values.shape = {np.shape(values)}")
@@ -7,6 +7,7 @@ from abc import ABC, abstractmethod
     
 class fvBC(ABC):
 
+    _version = 0  # bumped when boundary value changes
     BC_types = {}
     @classmethod
     def register_BC_type(cls, BC_type):
@@ -35,6 +36,7 @@ class fixedValueBC(fvBC):
     def update(self, value):
         """change value of field at boundary"""
         self._value = value
+        self._version += 1
     
         
     def correctBC(self, phi):
@@ -42,7 +44,7 @@ class fixedValueBC(fvBC):
         Inputs:
             phi: surfaceField
         """
-        phi[self._side] = self._value
+        phi[..., self._side] = self._value
 
 
     def correctBCdiv(self, eqn, phi):
@@ -54,7 +56,7 @@ class fixedValueBC(fvBC):
         sign = 1.
         if self._side==0:
             sign = -1.
-        eqn._Bvec[self._side] += sign * phi[self._side] * self._value
+        eqn._Bvec[..., self._side] += sign * phi[..., self._side] * self._value
 
 
     def correctBClaplacian(self, eqn, diff):
@@ -63,8 +65,21 @@ class fixedValueBC(fvBC):
             eqn: fvEqn
             diff: surfaceField, diffusivity on faces
         """
-        eqn._Amat[self._side, self._side] += 2 * diff[self._side] / diff.mesh.dX[self._side]
-        eqn._Bvec[self._side] += 2 * diff[self._side] * self._value / diff.mesh.dX[self._side]
+        coef = 2 * diff[..., self._side] * diff.mesh.invDX[..., self._side]
+        eqn._Amat[self._side, self._side] += coef
+        eqn._Bvec[..., self._side] += coef * self._value
+
+
+    def gradBC(self, field):
+        """
+        return gradient of field on boundary face
+        Inputs:
+            field: fvField
+        """
+        mesh = field.mesh
+        if self._side == 0:
+            return (field.field[..., 0] - self._value) / mesh.dXlow[..., 0]
+        return (self._value - field.field[..., -1]) / mesh.dXup[..., -1]
 
 
 @fvBC.register_BC_type("fixedGradient")
@@ -76,12 +91,18 @@ class fixedGradientBC(fvBC):
         self._side = side
 
 
+    def update(self, value):
+        """change gradient of field at boundary"""
+        self._value = value
+        self._version += 1
+
+
     def correctBC(self, phi):
         """
         Inputs:
             phi: surfaceField
         """
-        phi[self._side] = phi.fvField0[self._side] + 0.5 * self._value * phi.mesh.Xcells[self._side]
+        phi[..., self._side] = phi.fvField0[..., self._side] + 0.5 * self._value * phi.mesh.Xcells[..., self._side]
 
 
     def correctBCdiv(self, eqn, phi):
@@ -94,8 +115,8 @@ class fixedGradientBC(fvBC):
         sign = 1.
         if self._side==0:
             sign = -1.
-        eqn._Amat[self._side, self._side] += sign * phi[self._side]
-        eqn._Bvec[self._side] += sign *0.5 * self._value * phi[self._side] * phi.mesh.dX[self._side]
+        eqn._Amat[self._side, self._side] += sign * phi[..., self._side]
+        eqn._Bvec[..., self._side] += sign *0.5 * self._value * phi[..., self._side] * phi.mesh.dX[..., self._side]
 
 
     def correctBClaplacian(self, eqn, diff):
@@ -108,7 +129,16 @@ class fixedGradientBC(fvBC):
         sign = 1.
         if self._side==0:
             sign = -1.            
-        eqn._Bvec[self._side] += sign * diff[self._side] * self._value
+        eqn._Bvec[..., self._side] += sign * diff[..., self._side] * self._value
+
+
+    def gradBC(self, field):
+        """
+        return gradient of field on boundary face
+        Inputs:
+            field: fvField
+        """
+        return self._value
 
 
 @fvBC.register_BC_type("zeroGradient")
@@ -133,8 +163,19 @@ class cyclicBC(fvBC):
             phi: surfaceField
         """
         # linear interpolation between first and last cells
-        phi0 = phi.mesh.dX[-1] * phi.fvField0[0]
-        phiN = phi.mesh.dX[0] * phi.fvField0[-1]
-        phiCyclic = (phi0 + phiN) / (phi.mesh.dX[0] + phi.mesh.dX[-1])
-        phi[0] = phiCyclic
-        phi[-1] = phiCyclic
+        phi0 = phi.mesh.dX[..., -1] * phi.fvField0[..., 0]
+        phiN = phi.mesh.dX[..., 0] * phi.fvField0[..., -1]
+        phiCyclic = (phi0 + phiN) / (phi.mesh.dX[..., 0] + phi.mesh.dX[..., -1])
+        phi[..., 0] = phiCyclic
+        phi[..., -1] = phiCyclic
+
+
+    def gradBC(self, field):
+        """
+        return gradient of field on boundary face
+        Inputs:
+            field: fvField
+        """
+        mesh = field.mesh
+        return (field.field[..., 0] - field.field[..., -1]) / (
+            0.5 * (mesh.dX[..., 0] + mesh.dX[..., -1]))
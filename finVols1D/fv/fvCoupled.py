@@ -0,0 +1,106 @@
+"""
+System of equations of several fields solved together,
+coefficients of all fields are stored in one block tridiagonal matrix
+"""
+
+import numpy as np
+from finVols1D.fv.fvEquations import fvEqn
+from finVols1D.fv.fvMatrices import fvMatrix
+
+
+class fvCoupledEqn:
+
+    def __init__(self, mesh, fields):
+        """
+        Terms are added with the usual fvEqn methods on eqn(field),
+        inter-field terms with addCoupling or on eqn(rowField, colField)
+            UEqn = coupled.eqn(U)
+            UEqn.addDdt(U)
+            UEqn.addLaplacian(nuFaces, U)
+            coupled.addCoupling(U, C, -alpha)
+            U.update(coupled.solve()[0])
+        Inputs:
+            mesh: Mesh
+            fields: list of fvField, variables of the system
+        """
+        self._mesh = mesh
+        self._fields = list(fields)
+        for field in self._fields:
+            if field.bc0.name == "cyclic":
+                raise ValueError(
+                    f"cyclic field {field.name} not supported in fvCoupledEqn")
+        self._Amat = fvMatrix.create(
+            "blockTridiagonal", mesh.nCells, mesh.Xcells.shape[:-1],
+            m=len(self._fields))
+        self._Bvec = np.zeros(mesh.Xcells.shape + (len(self._fields),))
+        self._eqns = {}  # (row, col): fvEqn on matrix block views
+
+
+    def _index(self, field):
+        for k, f in enumerate(self._fields):
+            if f is field:
+                return k
+        raise ValueError(f"field {field.name} is not part of fvCoupledEqn")
+
+
+    def eqn(self, rowField, colField=None):
+        """
+        return fvEqn whose matrix and source vector are views on the system,
+        terms added to it act on colField in equation of rowField
+        Inputs:
+            rowField: fvField, field whose equation is modified
+            colField: fvField, field of the added terms, default rowField
+        """
+        if colField is None:
+            colField = rowField
+        r, c = self._index(rowField), self._index(colField)
+        if (r, c) not in self._eqns:
+            eqn = fvEqn(self._mesh)
+            eqn._Amat = self._Amat.component(r, c)
+            eqn._Bvec = self._Bvec[..., r]
+            self._eqns[(r, c)] = eqn
+        return self._eqns[(r, c)]
+
+
+    def addCoupling(self, rowField, colField, coef):
+        """
+        add implicit source coef * colField in equation of rowField,
+        implicit counterpart of fvEqn.addSource
+        Inputs:
+            rowField: fvField, field whose equation is modified
+            colField: fvField, field the source depends on
+            coef: float or ndarray, coefficient in each cell
+        """
+        self.eqn(rowField, colField)._Amat.addDiag(-coef)
+
+
+    def _finalize(self):
+        """
+        complete system with deferred Crank-Nicolson terms, all blocks
+        of the equation of a field with Crank-Nicolson ddt are averaged
+        between old and new values of their column field
+        """
+        rows = [r for (r, c), eqn in self._eqns.items()
+                if eqn._crankNicolson is not None]
+        for (r, c), eqn in self._eqns.items():
+            if eqn._crankNicolson is not None:
+                eqn._finalize()
+            elif r in rows:
+                eqn._Bvec -= 0.5 * eqn._Amat.matvec(self._fields[c].field)
+                for arr in eqn._Amat._arrays():
+                    arr *= 0.5
+
+
+    def solve(self):
+        """solve coupled system, return list of values of each field"""
+        self._finalize()
+        x = self._Amat.solve(self._Bvec)
+        return [np.ascontiguousarray(x[..., k]) for k in range(len(self._fields))]
+
+
+    def reset(self):
+        """Reset the matrix system and equations of blocks to zero"""
+        for eqn in self._eqns.values():
+            eqn.reset()
+        self._Amat.reset()
+        self._Bvec[:] = 0.
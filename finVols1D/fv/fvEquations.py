@@ -5,42 +5,105 @@ class to manage partial 1D differential equation
 import numpy as np
 from finVols1D.fv.fvTools import linInterp, courantNo
 from finVols1D.fv.fvSchemes.divSchemes import divScheme
+from finVols1D.fv.fvMatrices import fvMatrix
+from finVols1D.fv.fvSolvers import fvSolver
+from finVols1D.log import logger, logStep
 
 
 class fvEqn:
 
-    def __init__(self, mesh):
+    def __init__(self, mesh, matrix=None, solver=None, cacheFactorization=False):
         """
         Inputs:
             mesh: Mesh
+            matrix: str, matrix storage, "tridiagonal" or "dense"
+                default is the storage preferred by solver, or tridiagonal
+                tridiagonal storage switches to "cyclicTridiagonal"
+                when a field with cyclic boundaries is added
+            solver: str or dict, linear solver type and options
+                {"type":"bicgstab", "preconditioner":"ilu"}
+                default is the direct solver of matrix storage
+            cacheFactorization: bool, reuse matrix factorization
+                while matrix coefficients do not change, only a back
+                substitution is performed in solve. Factorization is
+                computed again if mesh, time step or coefficients change.
+                Terms are still assembled at each step. If mesh, time
+                step, storage and versions of coefficient fields (rho,
+                phi, diff) and boundary types are unchanged, factorization
+                is reused directly, otherwise assembled matrix is compared
+                to factorized one, an O(nCells) check. Coefficients written
+                directly in _Amat are only detected by this comparison,
+                which is always done if no term was added with add methods
+        With a batchFvMesh, one system is stored per column
+        and all columns are solved at once
         """
         self._mesh = mesh
+        # linear solver
+        self._solver = None
+        if solver is not None:
+            self._solver = fvSolver.create(solver)
+        if matrix is None:
+            matrix = "tridiagonal"
+            if self._solver is not None:
+                matrix = self._solver.matrixTypes[0]
         # initialize matrix and source vector
-        self.reset()
+        self._Amat = fvMatrix.create(
+            matrix, self._mesh.nCells, self._mesh.Xcells.shape[:-1])
+        self._Bvec = np.zeros(self._mesh.Xcells.shape)
+        if self._solver is not None:
+            self._solver.check(self._Amat)
+        # factorization cache, matrix copy is used to detect changes
+        self._cacheFactorization = cacheFactorization
+        self._factor = None
+        self._AmatFactor = None
+        # key of objects and parameters defining matrix coefficients,
+        # filled by add methods, factorization is reused if key is unchanged
+        self._coefKey = []
+        self._factorKey = None
+        if cacheFactorization and self._solver is not None \
+           and not self._solver.canFactorize:
+            raise ValueError(
+                f"linear solver {self._solver.name} can not cache factorization")
+        # ddt coefficients and old values, combined in solve
+        self._crankNicolson = None
         # initialize limiter array, 0 is upwind scheme, 1 is linear, and 2 is downwind
-        self._lim = np.zeros(self._mesh.nFaces)
+        # filled by TVD divergence schemes
+        self._lim = np.zeros(self._mesh.Xfaces.shape)
+        # iteration at which Courant number of (phi, field) was logged
+        self._courantLogged = {}
+        # work arrays of ddt, laplacian and upwind terms, reused at each step
+        self._cellWork = np.empty((2,) + self._mesh.Xcells.shape)
+        self._faceWork = np.empty((2,) + self._mesh.Xcells.shape[:-1] + (
+            self._mesh.nCells - 1,))
 
 
     def addDdt(self, field, scheme=None):
         """
         Add a temporal derivative term in equation
+        Inputs:
+            field: fvField
+            scheme: str, "Euler" (default), "BDF2" or "CrankNicolson"
         """
-        if field.time==None:
-            raise ValueError(
-                "trying to add time scheme on stationary problem\n"
-                + f"to run transient case, field {field.name} "
-                + "must be associated to a time object -> "
-                + "field(name, mesh, time, ..."
-            )
-        time = field.time
-        for i in range(self._mesh.nCells):
-            self._Amat[i, i] += self._mesh.dX[i] / (time.time - time.time_1)
-            self._Bvec[i] += field.field[i] * self._mesh.dX0[i] / (time.time - time.time_1)
+        self._addDdtTerm(None, field, scheme)
 
 
     def addRhoDdt(self, rho, field, scheme=None):
         """
         Add a temporal derivative term in equation
+        Inputs:
+            rho: fvField, density field
+            field: fvField
+            scheme: str, "Euler" (default), "BDF2" or "CrankNicolson"
+        """
+        self._addDdtTerm(rho, field, scheme)
+
+
+    def _addDdtTerm(self, rho, field, scheme):
+        """
+        Add d(rho field dX)/dt, BDF2 uses variable time step coefficients
+        and falls back on Euler when older values are not available.
+        With Crank-Nicolson, terms added to the equation are averaged
+        between old and new field values when solving
         """
         if field.time==None:
             raise ValueError(
@@ -49,10 +112,46 @@ class fvEqn:
                 + "must be associated to a time object -> "
                 + "field(name, mesh, time, ..."
             )
+        if scheme not in (None, "Euler", "BDF2", "CrankNicolson"):
+            raise ValueError(f"time scheme not supported: {scheme}")
+        self._checkCyclic(field)
+        mesh = self._mesh
         time = field.time
-        for i in range(self._mesh.nCells):
-            self._Amat[i, i] += self._mesh.dX[i] * rho.field[i] / (time.time - time.time_1)
-            self._Bvec[i] += rho.field0[i] * field.field[i] * self._mesh.dX0[i] / (time.time - time.time_1)
+        dt = time.time - time.time_1
+        if rho is None:
+            rho1, rho0, rho00 = 1., 1., 1.
+        else:
+            rho1, rho0, rho00 = rho.field, rho.field0, rho.field00
+        bdf2 = scheme == "BDF2" and field.field0 is not None \
+            and time.time_2 is not None and rho00 is not None
+        w = None
+        if bdf2:
+            # ratio of current to previous time step
+            w = dt / (time.time_1 - time.time_2)
+            # equals (1 + 2w)/(1 + w) dX on a fixed mesh, on a moving mesh
+            # uniform fields are kept uniform with mesh fluxes from dX - dX0
+            diag = (mesh.dX + w * mesh.dX0
+                    - w**2 / (1. + w) * mesh.dX00) * rho1 / dt
+            source = ((1. + w) * rho0 * field.field * mesh.dX0
+                      - w**2 / (1. + w) * rho00 * field.field0 * mesh.dX00) / dt
+        else:
+            # Euler coefficients computed in work arrays, no allocation
+            diag, source = self._cellWork
+            np.multiply(mesh.dX, rho1, out=diag)
+            diag /= dt
+            np.multiply(field.field, mesh.dX0, out=source)
+            source *= rho0
+            source /= dt
+        # time step and ratio rounded to ignore round-off of time values
+        self._addCoefKey(
+            "ddt", scheme, bdf2, rho, float(f"{dt:.12g}"),
+            None if w is None else float(f"{w:.12g}"))
+        if scheme == "CrankNicolson":
+            # work arrays are reused by other terms before solve
+            self._crankNicolson = (np.copy(diag), np.copy(source), field.field)
+        else:
+            self._Amat.addDiag(diag)
+            self._Bvec += source
 
     
     def addDiv(self, phi, field, scheme="upwind"):
@@ -61,22 +160,19 @@ class fvEqn:
         Inputs:
             phi: surfaceField
             field: fvField
-            scheme: default is upwind
+            scheme: str or divScheme, default is upwind
         """
-        meanCo, maxCo, minCo = courantNo(phi, phi.time._dt)
-        print(f"- Courant number, div({phi.name},{field.name}): mean={round(meanCo, 5)}"
-              + f", max={round(maxCo, 5)}, min={round(minCo, 5)}")
+        self._logCourant(phi, field)
+        self._checkCyclic(field)
         # scheme for divergence
-        divS = divScheme.create(scheme)
+        divS = scheme
+        if not isinstance(scheme, divScheme):
+            divS = divScheme.create(scheme)
         divS.addDiv(self, phi, field)
+        self._addCoefKey("div", type(divS), phi, field.bc0.name, field.bcN.name)
         
         if field.bc0.name == "cyclic":
-            if phi[0] >= 0:
-                self._Amat[0, -1] -= phi[0]
-                self._Amat[-1, -1] += phi[0]
-            else:
-                self._Amat[0, 0] -= phi[0]
-                self._Amat[-1, 0] += phi[0]
+            self._addCyclicDiv(phi)
         else:
             field.bc0.correctBCdiv(self, phi)
             field.bcN.correctBCdiv(self, phi)
@@ -89,22 +185,20 @@ class fvEqn:
             rho: fvField, density field
             phi: surfaceField
             field: fvField
-            scheme: default is upwind
+            scheme: str or divScheme, default is upwind
         """
-        meanCo, maxCo, minCo = courantNo(phi, phi.time._dt)
-        print(f"- Courant number, div({phi.name},{field.name}): mean={round(meanCo, 5)}"
-              + f", max={round(maxCo, 5)}, min={round(minCo, 5)}")
+        self._logCourant(phi, field)
+        self._checkCyclic(field)
         # scheme for divergence
-        divS = divSchemeSelector(scheme)
+        divS = scheme
+        if not isinstance(scheme, divScheme):
+            divS = divScheme.create(scheme)
         divS.addRhoDiv(self, rho, phi, field)
+        self._addCoefKey(
+            "rhoDiv", type(divS), rho, phi, field.bc0.name, field.bcN.name)
         
-        if field.bc0.name=="cyclic":
-            if phi[0] >= 0:
-                self._Amat[0, -1] -= phi[0]
-                self._Amat[-1, -1] += phi[0]
-            else:
-                self._Amat[0, 0] -= phi[0]
-                self._Amat[-1, 0] += phi[0]
+        if field.bc0.name == "cyclic":
+            self._addCyclicDiv(phi)
         else:
             field.bc0.correctBCdiv(self, phi)
             field.bcN.correctBCdiv(self, phi)
@@ -118,24 +212,20 @@ class fvEqn:
             field: fvField
             scheme: ???
         """
-        # internal field
-        for i in range(1, self._mesh.nCells-1):
-            self._Amat[i, i-1] -= diff[i] / (
-                self._mesh.Xcells[i]-self._mesh.Xcells[i-1])
-            self._Amat[i, i] += diff[i] / (
-                self._mesh.Xcells[i]-self._mesh.Xcells[i-1])
-            self._Amat[i, i] += diff[i+1] / (
-                self._mesh.Xcells[i+1]-self._mesh.Xcells[i])
-            self._Amat[i, i+1] -= diff[i+1] / (
-                self._mesh.Xcells[i+1]-self._mesh.Xcells[i])
-        self._Amat[0, 0] += diff[1] / (
-            self._mesh.Xcells[1]-self._mesh.Xcells[0])
-        self._Amat[0, 1] -= diff[1] / (
-            self._mesh.Xcells[1]-self._mesh.Xcells[0])
-        self._Amat[-1, -2] -= diff[-2] / (
-            self._mesh.Xcells[-1]-self._mesh.Xcells[-2])
-        self._Amat[-1, -1] += diff[-2] / (
-            self._mesh.Xcells[-1]-self._mesh.Xcells[-2])
+        self._checkCyclic(field)
+        self._addCoefKey("laplacian", diff, field.bc0.name, field.bcN.name)
+        # diffusive coefficients on internal faces
+        # coefficients computed in work arrays, no allocation
+        coef = self._faceWork[0]
+        np.multiply(diff.phi[..., 1:-1], self._mesh.invDXcc, out=coef)
+        diag = self._cellWork[0]
+        diag[..., :-1] = coef
+        diag[..., -1] = 0.
+        diag[..., 1:] += coef
+        self._Amat.addDiag(diag)
+        np.negative(coef, out=coef)
+        self._Amat.addDiag(coef, k=-1)
+        self._Amat.addDiag(coef, k=1)
         # boundary conditions
         field.bc0.correctBClaplacian(self, diff)
         field.bcN.correctBClaplacian(self, diff)
@@ -150,12 +240,209 @@ class fvEqn:
         self._Bvec[:] += field.field[:]
 
             
-    def solve(self):
-        """solve matrix system and return field values"""
-        return np.linalg.solve(self._Amat, self._Bvec)
+    def solve(self, out=None):
+        """
+        solve matrix system and return field values
+        Inputs:
+            out: ndarray, array receiving the solution, fvField.nextField
+                to solve directly into next time level of a field.
+                Tridiagonal storage and cached factorizations (Thomas,
+                LAPACK gtsv/gttrs) solve in out with preallocated work
+                arrays, a step with Euler ddt, upwind div and laplacian
+                terms does not allocate arrays of the mesh size. BDF2,
+                higher order div schemes, cyclic and dense storages
+                still allocate, linear solver backends copy their
+                solution in out
+        """
+        self._finalize()
+        if self._cacheFactorization:
+            return self._solveFactorized(out)
+        if self._solver is None:
+            return self._Amat.solve(self._Bvec, out)
+        # linear solver backends return a new array, copied in out
+        self._solver.check(self._Amat)
+        x = self._solver.solve(self._Amat, self._Bvec)
+        if out is None:
+            return x
+        out[...] = x
+        return out
+
+
+    def _solveFactorized(self, out=None):
+        """
+        solve matrix system reusing factorization if matrix is unchanged,
+        unchanged key of coefficients avoids comparison of matrices
+        """
+        if self._solver is not None:
+            self._solver.check(self._Amat)
+        key = (self._Amat.name, self._mesh._version, tuple(self._coefKey))
+        if self._factor is not None and self._coefKey \
+           and key == self._factorKey:
+            return self._factor.solve(self._Bvec, out)
+        # tolerance ignores round-off of time step computed from time values
+        if self._factor is None \
+           or not self._Amat.equals(self._AmatFactor, rtol=1e-12):
+            if self._solver is None:
+                self._factor = self._Amat.factorize()
+            else:
+                self._factor = self._solver.factorize(self._Amat)
+            self._AmatFactor = self._Amat.copy()
+        self._factorKey = key
+        return self._factor.solve(self._Bvec, out)
+
+
+    def _addCoefKey(self, *items):
+        """
+        record parameters of a term defining matrix coefficients,
+        fields are recorded by identity and version
+        """
+        self._coefKey.append(tuple(
+            (id(item), item._version) if hasattr(item, "_version") else item
+            for item in items))
+
+
+    def _finalize(self):
+        """
+        complete matrix system with terms whose assembly is deferred
+        (Crank-Nicolson ddt), must be called by every consumer before
+        reading _Amat and _Bvec, calling it again has no effect
+        """
+        if self._crankNicolson is not None:
+            self._applyCrankNicolson()
+
+
+    def _applyCrankNicolson(self):
+        """
+        average terms other than ddt between old and new field values,
+        (dX/dt + A/2) U = dX0/dt U0 + b - A/2 U0
+        """
+        diag, source, field0 = self._crankNicolson
+        self._Bvec += source - 0.5 * self._Amat.matvec(field0)
+        for arr in self._Amat._arrays():
+            arr *= 0.5
+        self._Amat.addDiag(diag)
+        self._crankNicolson = None
+
+
+    def _logCourant(self, phi, field):
+        """
+        log Courant number statistics, only computed if logged,
+        logged once per time step when terms are assembled several times
+        """
+        if phi.time is not None and logStep(phi.time):
+            key = (phi.name, field.name)
+            if self._courantLogged.get(key) == phi.time._iter:
+                return
+            self._courantLogged[key] = phi.time._iter
+            meanCo, maxCo, minCo = courantNo(phi, phi.time._dt)
+            logger.info(
+                "- Courant number, div(%s,%s): mean=%.5g, max=%.5g, min=%.5g",
+                phi.name, field.name, meanCo, maxCo, minCo)
+
+
+    def _addCyclicDiv(self, phi):
+        """
+        Add upwind flux through cyclic boundary, first and last cells
+        are coupled through matrix corners
+        Inputs:
+            phi: surfaceField
+        """
+        fluxPos = np.maximum(phi[..., 0], 0.)
+        fluxNeg = np.minimum(phi[..., 0], 0.)
+        self._Amat[0, -1] -= fluxPos
+        self._Amat[-1, -1] += fluxPos
+        self._Amat[0, 0] -= fluxNeg
+        self._Amat[-1, 0] += fluxNeg
+
+
+    def _checkCyclic(self, field):
+        """
+        switch tridiagonal storage to cyclic tridiagonal storage
+        when field has cyclic boundary conditions
+        Inputs:
+            field: fvField
+        """
+        if field.bc0.name == "cyclic" and self._Amat.name == "tridiagonal":
+            Amat = fvMatrix.create(
+                "cyclicTridiagonal", self._mesh.nCells,
+                self._mesh.Xcells.shape[:-1])
+            Amat.lower[:] = self._Amat.lower
+            Amat.diag[:] = self._Amat.diag
+            Amat.upper[:] = self._Amat.upper
+            self._Amat = Amat
 
 
     def reset(self):
         """Reset the matrix system to zero"""
-        self._Amat = np.zeros((self._mesh.nCells, self._mesh.nCells))
-        self._Bvec = np.zeros(self._mesh.nCells)
+        self._Amat.reset()
+        self._Bvec[:] = 0.
+        self._crankNicolson = None
+        self._coefKey = []
+
+
+
+class fvEqnTemplate(fvEqn):
+
+    def __init__(self, mesh, field, **kwargs):
+        """
+        Equation whose terms are declared once, coefficients are
+        refilled in preallocated storage at each solve
+        Inputs:
+            mesh: Mesh
+            field: fvField, variable solved by equation
+            kwargs: matrix, solver, cacheFactorization, see fvEqn
+        """
+        super(fvEqnTemplate, self).__init__(mesh, **kwargs)
+        self._field = field
+        self._terms = []  # list of (method name, arguments)
+
+
+    def ddt(self, scheme=None):
+        """declare temporal derivative term"""
+        self._terms.append(("addDdt", (self._field, scheme)))
+        return self
+
+
+    def rhoDdt(self, rho, scheme=None):
+        """declare temporal derivative term with density rho"""
+        self._terms.append(("addRhoDdt", (rho, self._field, scheme)))
+        return self
+
+
+    def div(self, phi, scheme="upwind"):
+        """declare divergence term, scheme object is created once"""
+        self._terms.append(
+            ("addDiv", (phi, self._field, divScheme.create(scheme))))
+        return self
+
+
+    def rhoDiv(self, rho, phi, scheme="upwind"):
+        """declare divergence term with density rho"""
+        self._terms.append(
+            ("addRhoDiv", (rho, phi, self._field, divScheme.create(scheme))))
+        return self
+
+
+    def laplacian(self, diff, scheme=None):
+        """declare laplacian term"""
+        self._terms.append(("addLaplacian", (diff, self._field, scheme)))
+        return self
+
+
+    def source(self, field):
+        """declare explicit source term"""
+        self._terms.append(("addSource", (field,)))
+        return self
+
+
+    def assemble(self):
+        """reset matrix system and add all declared terms"""
+        self.reset()
+        for method, args in self._terms:
+            getattr(self, method)(*args)
+
+
+    def solve(self, out=None):
+        """assemble declared terms, solve matrix system and return field values"""
+        self.assemble()
+        return super(fvEqnTemplate, self).solve(out)
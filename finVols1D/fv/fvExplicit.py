@@ -0,0 +1,104 @@
+"""
+Explicit strong stability preserving Runge-Kutta time integration,
+spatial terms are evaluated as A U - b, no matrix system is solved
+"""
+
+import numpy as np
+
+
+class fvExplicitSolver:
+
+    # Shu-Osher coefficients, stage k is
+    # U_k+1 = a_k U_0 + (1 - a_k) (U_k + dt L(U_k))
+    schemes = {
+        "forwardEuler": (0.,),
+        "SSPRK2": (0., 0.5),
+        "SSPRK3": (0., 0.75, 1./3.),
+    }
+
+    def __init__(self, eqn, field, assemble, solverDict=None):
+        """
+        Advance dX dU/dt = b(U) - A(U) U over one time step, A and b
+        are assembled at each stage from spatial terms only
+            Uiter = Ufield.clone()
+            phiU = fv.surfaceField("u", mesh, Uiter)
+            def assemble(eqn, Uiter):
+                phiU.update(Uiter)
+                eqn.addDiv(phiU, Uiter)
+            explicit = fvExplicitSolver(UEqn, Ufield, assemble, {"scheme":"SSPRK3"})
+            Ufield.update(explicit.solve(Uiter))
+        Inputs:
+            eqn: fvEqn, storage of spatial terms, reused at each stage
+            field: fvField, advanced field
+            assemble: callable assemble(eqn, iterField), add spatial terms
+                of equation evaluated at iterField, without ddt term
+            solverDict: dict, entries
+                scheme: "forwardEuler", "SSPRK2" or "SSPRK3" (default)
+        Mesh cells are assumed fixed during the time step
+        """
+        if solverDict is None:
+            solverDict = {}
+        self._eqn = eqn
+        self._field = field
+        self._assemble = assemble
+        self._scheme = solverDict.get("scheme", "SSPRK3")
+        if self._scheme not in self.schemes:
+            raise ValueError(
+                f"explicit time scheme not supported: {self._scheme}")
+
+
+    def rate(self, iterField):
+        """
+        return dU/dt evaluated at iterField
+        Inputs:
+            iterField: fvField
+        """
+        self._eqn.reset()
+        self._assemble(self._eqn, iterField)
+        residual = self._eqn._Bvec - self._eqn._Amat.matvec(iterField.field)
+        residual *= self._field.mesh.invDX
+        return residual
+
+
+    def solve(self, iterField=None):
+        """
+        return values of field at end of time step
+        Inputs:
+            iterField: fvField, field holding stage values, passed to
+                assemble, default is a clone of field
+        """
+        if iterField is None:
+            iterField = self._field.clone()
+        time = self._field.time
+        dt = time.time - time.time_1
+        U0 = self._field.field
+        iterField.field = np.copy(U0)
+        for a in self.schemes[self._scheme]:
+            Uk = iterField.field + dt * self.rate(iterField)
+            if a > 0.:
+                Uk = a * U0 + (1. - a) * Uk
+            iterField.field = Uk
+        return iterField.field
+
+
+    def stableDt(self, iterField=None):
+        """
+        return largest stable time step of forward Euler, min(dX / A_ii),
+        SSP schemes are stable with the same time step
+        Inputs:
+            iterField: fvField, state where terms are evaluated,
+                default is current field
+        """
+        if iterField is None:
+            iterField = self._field
+        self._eqn.reset()
+        self._assemble(self._eqn, iterField)
+        Amat = self._eqn._Amat
+        if Amat.name == "dense":
+            diag = np.diagonal(Amat.A, axis1=-2, axis2=-1)
+        else:
+            diag = Amat.diag
+        dX = self._field.mesh.dX
+        dtCells = np.divide(
+            dX, diag, out=np.full(diag.shape, np.inf), where=diag > 0.)
+        return np.min(dtCells)
@@ -2,13 +2,52 @@
 Class to manage finite volume fields
 """
 
+import copy
 import numpy as np
+from numpy.lib.mixins import NDArrayOperatorsMixin
 from finVols1D.fv.fvTools import linInterp
 from finVols1D.fv.fvBoundaries import fvBC, zeroGradientBC
 
 
-class fvField:
-    
+def _values(x):
+    """return array of values of fvField or surfaceField, x otherwise"""
+    if isinstance(x, fvField):
+        return x.field
+    if isinstance(x, surfaceField):
+        return x.phi
+    return x
+
+
+def _arrayUfunc(ufunc, method, inputs, kwargs):
+    """
+    apply numpy ufunc to values of fields, return ndarray,
+    or fields given in out after writing into their values
+    """
+    inputs = tuple(_values(x) for x in inputs)
+    outFields = kwargs.get("out", ())
+    if outFields:
+        kwargs["out"] = tuple(_values(x) for x in outFields)
+    result = getattr(ufunc, method)(*inputs, **kwargs)
+    if not outFields:
+        return result
+    for x in outFields:
+        if isinstance(x, (fvField, surfaceField)):
+            x._version += 1
+    return outFields[0] if len(outFields) == 1 else outFields
+
+
+class fvField(NDArrayOperatorsMixin):
+    """
+    Arithmetic operators and numpy ufuncs act on current values,
+    U * V returns an ndarray, U += V and np.multiply(U, V, out=W)
+    write into the values of U and W without allocating a field.
+    Comparisons are elementwise as for ndarray, U == V and U < V return
+    boolean arrays, fields are hashed by identity and can be dict keys,
+    use "is" to compare fields themselves
+    """
+
+    _nLevels = 3  # number of time levels, field, field0 and field00
+
     def __init__(
             self,
             name,
@@ -32,28 +71,153 @@ class fvField:
         self.name = name
         self.mesh = mesh
         self.time = time
-        self.field = np.zeros(self.mesh.nCells)
-        self.field0 = None  # field at time step n-1 (previous)
-        self.field00 = None  # field at time step n-2
+        # version is bumped when values change, derived quantities
+        # (face values, gradients) are cached until values change
+        self._version = 0
+        self._cache = {}
+        # current values stay at a fixed address, so that they can be a
+        # view into an fvState buffer, previous time levels and buffer of
+        # next time level rotate in a ring buffer
+        self._current = np.zeros(self.mesh.Xcells.shape)
+        self._history = np.zeros((self._nLevels,) + self.mesh.Xcells.shape)
+        self._slots = [0, 1, 2]  # slots of field0, field00 and nextField
+        self._nValid = 1  # number of stored time levels
         self._initialize(values=values)
         self._setBC(bc0, bcN)
 
 
     def update(self, values):
         """
+        store values as new time level, previous levels are shifted,
+        current values are copied in the slot of oldest level, then
+        values are copied in current values, no array is allocated.
+        field keeps the same address and holds the new values, arrays
+        returned by field0 and field00 are slots which rotate at each
+        update, copy them to keep values of a time level
+            U0 = np.copy(U.field0)
         Inputs:
         - values: ndarray, field cell center values
         """
-        self.field00 = self.field0
-        self.field0 = self.field
-        self.field = values
+        slot0, slot00, slotNext = self._slots
+        np.copyto(self._history[slot00], self._current)
+        self._slots = [slot00, slot0, slotNext]
+        np.copyto(self._current, values)
+        self._nValid = min(self._nValid + 1, self._nLevels)
+        self._version += 1
+
+
+    @property
+    def nextField(self):
+        """
+        buffer receiving next time level, equations can solve into it
+            U.update(UEqn.solve(out=U.nextField))
+        does not hold any time level, update copies values in field
+        and rotates field0 and field00 only, so nextField is the same
+        array at every step
+        """
+        return self._history[self._slots[2]]
+
+
+    def _buffer(self, k):
+        """return array storing values k time levels before current one"""
+        if k == 0:
+            return self._current
+        return self._history[self._slots[k-1]]
+
+
+    def _level(self, k):
+        """return view on values k time levels before current one"""
+        if k >= self._nValid:
+            return None
+        return self._buffer(k)
+
+
+    def _setLevel(self, k, values):
+        if values is None:
+            self._nValid = min(self._nValid, k)
+            return
+        np.copyto(self._buffer(k), values)
+        self._nValid = max(self._nValid, k + 1)
+
+
+    @property
+    def field(self):
+        """cell center values, assigning values bumps field version"""
+        return self._level(0)
+
+
+    @field.setter
+    def field(self, values):
+        self._setLevel(0, values)
+        self._version += 1
+
+
+    @property
+    def field0(self):
+        """field at time step n-1 (previous), None if not available"""
+        return self._level(1)
+
+
+    @field0.setter
+    def field0(self, values):
+        self._setLevel(1, values)
+
+
+    @property
+    def field00(self):
+        """field at time step n-2, None if not available"""
+        return self._level(2)
+
+
+    @field00.setter
+    def field00(self, values):
+        self._setLevel(2, values)
+
+
+    def cached(self, name, compute):
+        """
+        return read-only derived quantity, computed again only if field
+        values, boundary conditions or mesh changed since last call
+        values written through U.field are not detected, use update,
+        in place operators and out= on the field are detected
+        Inputs:
+        - name: str, name of quantity
+        - compute: callable compute(field) returning an ndarray
+        """
+        key = (self._version, self.bc0._version, self.bcN._version,
+               self.mesh._version)
+        entry = self._cache.get(name)
+        if entry is None or entry[0] != key:
+            values = compute(self)
+            values.flags.writeable = False
+            entry = (key, values)
+            self._cache[name] = entry
+        return entry[1]
+
+
+    def clone(self, name=None):
+        """
+        return field with a copy of current values, sharing mesh, time
+        and boundary condition objects, previous values are not copied
+        Inputs:
+        - name: str, name of new field, default is name of field
+        """
+        field = copy.copy(self)
+        field.name = self.name if name is None else name
+        field._cache = {}
+        field._current = np.zeros(self._current.shape)
+        field._history = np.zeros(self._history.shape)
+        field._slots = [0, 1, 2]
+        field._nValid = 1
+        field.field = self.field
+        return field
 
         
     def _initialize(self, values):
         if np.all(values)!=None:
             val = np.copy(values)
             if val.shape==(1,) or isinstance(values, float):
-                self.field = val * np.ones(self.mesh.nCells)
+                self.field = val
             elif val.shape==self.field.shape:
                 self.field = val
             else:
@@ -80,10 +244,16 @@ class fvField:
             
         
 
-    def __add__(self, field):
-        """addition fvField"""
-        return self.field + field.field
-    
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        return _arrayUfunc(ufunc, method, inputs, kwargs)
+
+
+    def __array__(self, dtype=None, copy=None):
+        return np.asarray(self.field, dtype=dtype)
+
+    # comparisons are elementwise, fields are hashed by identity
+    __hash__ = object.__hash__
+
 
     def __iter__(self):
         return iter(self.field)
@@ -94,11 +264,12 @@ class fvField:
 
 
 
-class surfaceField:
+class surfaceField(NDArrayOperatorsMixin):
 
     def __init__(self, name, mesh, fvField0):
         """
-        Surface field on internal faces only
+        Surface field on internal faces only,
+        arithmetic acts on phi as for fvField
         Inputs:
         - name: str, name of surface field
         - mesh: Mesh
@@ -108,7 +279,10 @@ class surfaceField:
         self.mesh = mesh
         self.fvField0 = fvField0
         self.time = self.fvField0.time
-        self.phi = np.zeros(self.mesh.nFaces)
+        # version is bumped when values change, used by equations to
+        # reuse factorization, values modified through phi are not detected
+        self._version = 0
+        self.phi = np.zeros(self.mesh.Xfaces.shape)
         self.update(self.fvField0)
 
 
@@ -118,8 +292,10 @@ class surfaceField:
         Inputs:
         - field: fvField to interpolate
         """
-        self.phi[1:-1] = linInterp(self.mesh, field.field)
+        self.phi[..., 1:-1] = field.cached(
+            "linInterp", lambda f: linInterp(f.mesh, f.field))
         self.correctBC()
+        self._version += 1
 
 
     def makeRelative(self):
@@ -127,6 +303,7 @@ class surfaceField:
         correct flux with flux due to mesh motion
         """
         self.phi[:] -= self.mesh.phiMesh[:]
+        self._version += 1
 
 
     def correctBC(self):
@@ -134,10 +311,16 @@ class surfaceField:
         self.fvField0.bcN.correctBC(self)
 
 
-    def __add__(self, phi):
-        """addition surfaceField"""
-        return self.phi + phi.phi
-    
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        return _arrayUfunc(ufunc, method, inputs, kwargs)
+
+
+    def __array__(self, dtype=None, copy=None):
+        return np.asarray(self.phi, dtype=dtype)
+
+    # comparisons are elementwise, fields are hashed by identity
+    __hash__ = object.__hash__
+
         
     def __iter__(self):
         return iter(self.phi)
@@ -149,3 +332,4 @@ class surfaceField:
     
     def __setitem__(self, index, value):
         self.phi[index] = value
+        self._version += 1
@@ -0,0 +1,647 @@
+"""
+Classes to store the matrix of a finite volume equation
+"""
+
+import copy
+import numpy as np
+from abc import ABC, abstractmethod
+
+try:
+    from scipy.linalg import lapack
+except ImportError:  # scipy is optional, fall back on numpy Thomas algorithm
+    lapack = None
+
+
+def _output(x, out):
+    """return x, copied in out if out is given and x is another array"""
+    if out is None or x is out:
+        return x
+    out[...] = x
+    return out
+
+
+def thomas(lower, diag, upper, rhs, out=None, work=None):
+    """
+    solve tridiagonal system with Thomas algorithm
+    Inputs:
+    - lower: ndarray, sub diagonal, lower[i] = A[i, i-1], lower[0] ignored
+    - diag: ndarray, main diagonal, diag[i] = A[i, i]
+    - upper: ndarray, super diagonal, upper[i] = A[i, i+1], upper[-1] ignored
+    - rhs: ndarray, right hand side
+    - out: ndarray, array receiving the solution, may be rhs
+    - work: ndarray, workspace shaped like the solution, overwritten
+    """
+    n = diag.shape[-1]
+    shape = np.broadcast(diag, rhs).shape
+    # modified super diagonal
+    cp = np.empty(shape) if work is None or work.shape != shape else work
+    # modified rhs, then solution, rhs[i] is read before x[i] is written
+    x = np.empty(cp.shape) if out is None else out
+    cp[..., 0] = upper[..., 0] / diag[..., 0]
+    x[..., 0] = rhs[..., 0] / diag[..., 0]
+    for i in range(1, n):
+        denom = diag[..., i] - lower[..., i] * cp[..., i-1]
+        cp[..., i] = upper[..., i] / denom
+        x[..., i] = (rhs[..., i] - lower[..., i] * x[..., i-1]) / denom
+    for i in range(n-2, -1, -1):
+        x[..., i] -= cp[..., i] * x[..., i+1]
+    return x
+
+
+def solveTridiagonal(lower, diag, upper, rhs, out=None, work=None):
+    """
+    solve tridiagonal system, LAPACK gtsv is used when scipy is available
+    Inputs: see thomas, rhs may hold several right hand sides (nRhs, n)
+    with gtsv, rhs is copied in out and solved in place
+    - work: tuple of 3 ndarrays shaped like diag, overwritten by copies
+        of coefficients factorized by gtsv, work[0] is the Thomas workspace
+    """
+    if lapack is None or diag.ndim > 1 or diag.shape[-1] < 2:
+        return thomas(lower, diag, upper, rhs, out,
+                      None if work is None else work[0])
+    if out is not None:
+        out[...] = rhs
+        rhs = out
+    overwrite = work is not None
+    if overwrite:
+        dl, d, du = work[0][1:], work[1], work[2][:-1]
+        np.copyto(dl, lower[1:])
+        np.copyto(d, diag)
+        np.copyto(du, upper[:-1])
+    else:
+        dl, d, du = lower[1:], diag, upper[:-1]
+    _, _, _, x, info = lapack.dgtsv(
+        dl, d, du, rhs.T, overwrite_dl=overwrite, overwrite_d=overwrite,
+        overwrite_du=overwrite, overwrite_b=out is not None)
+    if info > 0:
+        raise np.linalg.LinAlgError("Singular matrix")
+    return _output(x.T, out)
+
+
+def _matvec(A, x):
+    """product of stacked matrices A (..., m, m) and vectors x (..., m)"""
+    return (A @ x[..., None])[..., 0]
+
+
+class tridiagonalFactor:
+
+    def __init__(self, lower, diag, upper):
+        """
+        LU factorization of a tridiagonal matrix, reused for several rhs
+        LAPACK gttrf is used when scipy is available
+        Inputs: see thomas
+        """
+        if lapack is None or diag.ndim > 1 or diag.shape[-1] < 2:
+            # forward sweep of Thomas algorithm on matrix coefficients
+            n = diag.shape[-1]
+            self._lower = np.copy(lower)
+            self._cp = np.empty(diag.shape)
+            self._rdenom = np.empty(diag.shape)
+            self._rdenom[..., 0] = 1. / diag[..., 0]
+            self._cp[..., 0] = upper[..., 0] * self._rdenom[..., 0]
+            for i in range(1, n):
+                self._rdenom[..., i] = 1. / (
+                    diag[..., i] - lower[..., i] * self._cp[..., i-1])
+                self._cp[..., i] = upper[..., i] * self._rdenom[..., i]
+            self._lu = None
+        else:
+            self._lu = lapack.dgttrf(lower[1:], diag, upper[:-1])
+            if self._lu[-1] > 0:
+                raise np.linalg.LinAlgError("Singular matrix")
+
+
+    def solve(self, b, out=None):
+        """
+        return solution for right hand side b, shape (n,) or (nRhs, n),
+        back substitution is done in out if given, b may be out
+        """
+        if self._lu is not None:
+            if out is not None:
+                out[...] = b
+                b = out
+            x, info = lapack.dgttrs(
+                *self._lu[:-1], b.T, overwrite_b=out is not None)
+            return _output(x.T, out)
+        n = self._cp.shape[-1]
+        x = np.empty(np.broadcast(self._cp, b).shape) if out is None else out
+        x[..., 0] = b[..., 0] * self._rdenom[..., 0]
+        for i in range(1, n):
+            x[..., i] = (b[..., i] - self._lower[..., i] * x[..., i-1]) \
+                * self._rdenom[..., i]
+        for i in range(n-2, -1, -1):
+            x[..., i] -= self._cp[..., i] * x[..., i+1]
+        return x
+
+
+class fvMatrix(ABC):
+
+    matrix_types = {}
+    @classmethod
+    def register_matrix_type(cls, matrix_type):
+        def decorator(subclass):
+            cls.matrix_types[matrix_type] = subclass
+            return subclass
+        return decorator
+
+    @classmethod
+    def create(cls, matrixType, n, batchShape=(), **kwargs):
+        if matrixType not in cls.matrix_types:
+            raise ValueError(
+                "matrix type not supported: " + matrixType)
+        return cls.matrix_types[matrixType](n, batchShape, **kwargs)
+
+    @abstractmethod
+    def addDiag(self, values, k=0):
+        """add values to k-th diagonal, k in (-1, 0, 1)"""
+
+    @abstractmethod
+    def reset(self):
+        """set all coefficients to zero"""
+
+    @abstractmethod
+    def solve(self, b, out=None):
+        """
+        return solution x of A x = b
+        Inputs:
+        - b: ndarray, right hand side
+        - out: ndarray, array receiving the solution
+        """
+
+    @abstractmethod
+    def matvec(self, x):
+        """return product A x"""
+
+    @abstractmethod
+    def toDense(self):
+        """return matrix as a dense ndarray"""
+
+    @abstractmethod
+    def toSparse(self):
+        """return matrix in scipy sparse CSC format"""
+
+    @abstractmethod
+    def factorize(self):
+        """return factorization of matrix with a solve(b) method"""
+
+    @abstractmethod
+    def _arrays(self):
+        """return arrays storing matrix coefficients"""
+
+    def copy(self):
+        return copy.deepcopy(self)
+
+    def equals(self, other, rtol=0.):
+        """
+        return True if other matrix has the same storage and coefficients
+        Inputs:
+        - other: fvMatrix
+        - rtol: float, relative tolerance on coefficients
+        """
+        return self.name == other.name and all(
+            np.allclose(a, b, rtol=rtol, atol=0.)
+            for a, b in zip(self._arrays(), other._arrays()))
+
+
+# - - - DENSE MATRIX - - - #
+
+@fvMatrix.register_matrix_type("dense")
+class denseMatrix(fvMatrix):
+
+    def __init__(self, n, batchShape=()):
+        """
+        Inputs:
+        - n: int, number of unknowns
+        - batchShape: tuple, shape of independent systems, () for one system
+        """
+        self.name = "dense"
+        self.n = n
+        self.batchShape = tuple(batchShape)
+        self.A = np.zeros(tuple(batchShape) + (n, n))
+
+
+    def addDiag(self, values, k=0):
+        idx = np.arange(self.n - abs(k))
+        if k >= 0:
+            self.A[..., idx, idx+k] += values
+        else:
+            self.A[..., idx-k, idx] += values
+
+
+    def reset(self):
+        self.A[:] = 0.
+
+
+    def solve(self, b, out=None):
+        return _output(np.linalg.solve(self.A, b[..., None])[..., 0], out)
+
+
+    def matvec(self, x):
+        return _matvec(self.A, x)
+
+
+    def toDense(self):
+        return np.copy(self.A)
+
+
+    def toSparse(self):
+        from scipy import sparse
+        if self.A.ndim > 2:
+            raise ValueError("sparse format not available for batch of matrices")
+        return sparse.csc_matrix(self.A)
+
+
+    def factorize(self):
+        return denseFactor(self.A)
+
+
+    def _arrays(self):
+        return (self.A,)
+
+
+    def __getitem__(self, index):
+        return self.A[(...,) + index]
+
+
+    def __setitem__(self, index, value):
+        self.A[(...,) + index] = value
+
+
+# - - - TRIDIAGONAL MATRIX - - - #
+
+@fvMatrix.register_matrix_type("tridiagonal")
+class tridiagonalMatrix(fvMatrix):
+
+    def __init__(self, n, batchShape=()):
+        """
+        Only main, sub and super diagonals are stored,
+        memory and solve cost scale linearly with n
+        Inputs:
+        - n: int, number of unknowns
+        - batchShape: tuple, shape of independent systems, () for one system
+            all systems are solved in a single Thomas sweep
+        """
+        self.name = "tridiagonal"
+        self.n = n
+        self.batchShape = tuple(batchShape)
+        shape = tuple(batchShape) + (n,)
+        self.lower = np.zeros(shape)  # lower[i] = A[i, i-1]
+        self.diag = np.zeros(shape)  # diag[i] = A[i, i]
+        self.upper = np.zeros(shape)  # upper[i] = A[i, i+1]
+        self._work = None  # workspace of solve, allocated once
+
+
+    def addDiag(self, values, k=0):
+        if k == 0:
+            self.diag += values
+        elif k == -1:
+            self.lower[..., 1:] += values
+        elif k == 1:
+            self.upper[..., :-1] += values
+        else:
+            raise IndexError(
+                f"diagonal {k} is outside of tridiagonal band, "
+                + "use a dense matrix")
+
+
+    def reset(self):
+        self.lower[:] = 0.
+        self.diag[:] = 0.
+        self.upper[:] = 0.
+
+
+    def solve(self, b, out=None):
+        if self._work is None or self._work[0].shape != self.diag.shape:
+            self._work = tuple(np.empty(self.diag.shape) for k in range(3))
+        return solveTridiagonal(
+            self.lower, self.diag, self.upper, b, out, self._work)
+
+
+    def matvec(self, x):
+        y = self.diag * x
+        y[..., 1:] += self.lower[..., 1:] * x[..., :-1]
+        y[..., :-1] += self.upper[..., :-1] * x[..., 1:]
+        return y
+
+
+    def toDense(self):
+        A = np.zeros(self.batchShape + (self.n, self.n))
+        idx = np.arange(self.n)
+        A[..., idx, idx] = self.diag
+        A[..., idx[1:], idx[:-1]] = self.lower[..., 1:]
+        A[..., idx[:-1], idx[1:]] = self.upper[..., :-1]
+        return A
+
+
+    def toSparse(self):
+        from scipy import sparse
+        if self.diag.ndim > 1:
+            raise ValueError("sparse format not available for batch of matrices")
+        return sparse.diags(
+            [self.lower[1:], self.diag, self.upper[:-1]], [-1, 0, 1],
+            format="csc")
+
+
+    def factorize(self):
+        return tridiagonalFactor(self.lower, self.diag, self.upper)
+
+
+    def _arrays(self):
+        return (self.lower, self.diag, self.upper)
+
+
+    def _locate(self, index):
+        """return diagonal array and position storing entry A[i, j]"""
+        i, j = index
+        i, j = i % self.n, j % self.n
+        if j == i:
+            return self.diag, i
+        elif j == i-1:
+            return self.lower, i
+        elif j == i+1:
+            return self.upper, i
+        raise IndexError(
+            f"entry ({i}, {j}) is outside of tridiagonal band, "
+            + "use a dense matrix")
+
+
+    def __getitem__(self, index):
+        arr, i = self._locate(index)
+        return arr[..., i]
+
+
+    def __setitem__(self, index, value):
+        arr, i = self._locate(index)
+        arr[..., i] = value
+
+
+# - - - CYCLIC TRIDIAGONAL MATRIX - - - #
+
+@fvMatrix.register_matrix_type("cyclicTridiagonal")
+class cyclicTridiagonalMatrix(tridiagonalMatrix):
+
+    def __init__(self, n, batchShape=()):
+        """
+        Tridiagonal matrix with corner entries for periodic boundaries,
+        corners are stored in lower[0] = A[0, -1] and upper[-1] = A[-1, 0]
+        Inputs:
+        - n: int, number of unknowns
+        - batchShape: tuple, shape of independent systems, () for one system
+        """
+        super(cyclicTridiagonalMatrix, self).__init__(n, batchShape)
+        self.name = "cyclicTridiagonal"
+
+
+    def solve(self, b, out=None):
+        """
+        Sherman-Morrison formula, corners are removed from the matrix
+        and two tridiagonal systems are solved in a single sweep
+        """
+        gamma = -self.diag[..., 0]
+        alpha, beta = self.upper[..., -1], self.lower[..., 0]
+        diag = np.copy(self.diag)
+        diag[..., 0] -= gamma
+        diag[..., -1] -= alpha * beta / gamma
+        rhs = np.zeros((2,) + self.diag.shape)
+        rhs[0] = b
+        rhs[1, ..., 0] = gamma
+        rhs[1, ..., -1] = alpha
+        y, z = solveTridiagonal(self.lower, diag, self.upper, rhs)
+        fact = (y[..., 0] + beta * y[..., -1] / gamma) / (
+            1. + z[..., 0] + beta * z[..., -1] / gamma)
+        return np.subtract(y, fact[..., None] * z, out=out)
+
+
+    def matvec(self, x):
+        y = super(cyclicTridiagonalMatrix, self).matvec(x)
+        y[..., 0] += self.lower[..., 0] * x[..., -1]
+        y[..., -1] += self.upper[..., -1] * x[..., 0]
+        return y
+
+
+    def factorize(self):
+        return cyclicTridiagonalFactor(self.lower, self.diag, self.upper)
+
+
+    def toDense(self):
+        A = super(cyclicTridiagonalMatrix, self).toDense()
+        A[..., 0, -1] += self.lower[..., 0]
+        A[..., -1, 0] += self.upper[..., -1]
+        return A
+
+
+    def toSparse(self):
+        A = super(cyclicTridiagonalMatrix, self).toSparse().tolil()
+        A[0, self.n-1] += self.lower[0]
+        A[self.n-1, 0] += self.upper[-1]
+        return A.tocsc()
+
+
+    def _locate(self, index):
+        i, j = index
+        i, j = i % self.n, j % self.n
+        if j == i:
+            return self.diag, i
+        elif j == (i-1) % self.n:
+            return self.lower, i
+        elif j == (i+1) % self.n:
+            return self.upper, i
+        raise IndexError(
+            f"entry ({i}, {j}) is outside of cyclic tridiagonal band, "
+            + "use a dense matrix")
+
+
+# - - - BLOCK TRIDIAGONAL MATRIX - - - #
+
+@fvMatrix.register_matrix_type("blockTridiagonal")
+class blockTridiagonalMatrix(fvMatrix):
+
+    def __init__(self, n, batchShape=(), m=1):
+        """
+        Tridiagonal matrix of m x m blocks coupling m variables per cell,
+        unknowns are ordered by cell then variable, x[..., i, a]
+        Inputs:
+        - n: int, number of cells
+        - batchShape: tuple, shape of independent systems, () for one system
+        - m: int, number of variables per cell
+        """
+        self.name = "blockTridiagonal"
+        self.n = n
+        self.batchShape = tuple(batchShape)
+        self.m = m
+        shape = tuple(batchShape) + (n, m, m)
+        self.lower = np.zeros(shape)  # lower[i] = A[i, i-1] block
+        self.diag = np.zeros(shape)  # diag[i] = A[i, i] block
+        self.upper = np.zeros(shape)  # upper[i] = A[i, i+1] block
+
+
+    def addDiag(self, values, k=0):
+        """add blocks to k-th block diagonal, k in (-1, 0, 1)"""
+        if k == 0:
+            self.diag += values
+        elif k == -1:
+            self.lower[..., 1:, :, :] += values
+        elif k == 1:
+            self.upper[..., :-1, :, :] += values
+        else:
+            raise IndexError(
+                f"diagonal {k} is outside of block tridiagonal band")
+
+
+    def component(self, r, c):
+        """
+        return tridiagonalMatrix whose coefficients are views on
+        coupling of variable c in equation of variable r
+        Inputs:
+        - r, c: int, variable indices
+        """
+        Amat = tridiagonalMatrix(self.n, self.diag.shape[:-3])
+        Amat.lower = self.lower[..., r, c]
+        Amat.diag = self.diag[..., r, c]
+        Amat.upper = self.upper[..., r, c]
+        return Amat
+
+
+    def reset(self):
+        self.lower[:] = 0.
+        self.diag[:] = 0.
+        self.upper[:] = 0.
+
+
+    def solve(self, b, out=None):
+        """block Thomas algorithm, b has shape batchShape + (n, m)"""
+        return self.factorize().solve(b, out)
+
+
+    def matvec(self, x):
+        """x has shape batchShape + (n, m)"""
+        y = _matvec(self.diag, x)
+        y[..., 1:, :] += _matvec(self.lower[..., 1:, :, :], x[..., :-1, :])
+        y[..., :-1, :] += _matvec(self.upper[..., :-1, :, :], x[..., 1:, :])
+        return y
+
+
+    def toDense(self):
+        n, m = self.n, self.m
+        A = np.zeros((n*m, n*m))
+        for i in range(n):
+            A[i*m:(i+1)*m, i*m:(i+1)*m] = self.diag[i]
+            if i > 0:
+                A[i*m:(i+1)*m, (i-1)*m:i*m] = self.lower[i]
+            if i < n-1:
+                A[i*m:(i+1)*m, (i+1)*m:(i+2)*m] = self.upper[i]
+        return A
+
+
+    def toSparse(self):
+        from scipy import sparse
+        if self.diag.ndim > 3:
+            raise ValueError("sparse format not available for batch of matrices")
+        n = self.n
+        rows = np.r_[np.arange(1, n), np.arange(n), np.arange(n-1)]
+        cols = np.r_[np.arange(n-1), np.arange(n), np.arange(1, n)]
+        data = np.concatenate([self.lower[1:], self.diag, self.upper[:-1]])
+        order = np.lexsort((cols, rows))
+        indptr = np.r_[0, np.cumsum(np.bincount(rows, minlength=n))]
+        return sparse.bsr_matrix(
+            (data[order], cols[order], indptr),
+            shape=(n*self.m, n*self.m)).tocsc()
+
+
+    def factorize(self):
+        return blockTridiagonalFactor(self.lower, self.diag, self.upper)
+
+
+    def _arrays(self):
+        return (self.lower, self.diag, self.upper)
+
+
+# - - - FACTORIZATIONS - - - #
+
+class denseFactor:
+
+    def __init__(self, A):
+        """
+        LU factorization of a dense matrix, inverse is stored
+        when scipy is not available or for batch of matrices
+        """
+        if lapack is None or A.ndim > 2:
+            self._inv = np.linalg.inv(A)
+            self._lu = None
+        else:
+            from scipy.linalg import lu_factor
+            self._lu = lu_factor(A)
+
+
+    def solve(self, b, out=None):
+        if self._lu is None:
+            return _output((self._inv @ b[..., None])[..., 0], out)
+        from scipy.linalg import lu_solve
+        return _output(lu_solve(self._lu, b), out)
+
+
+class cyclicTridiagonalFactor:
+
+    def __init__(self, lower, diag, upper):
+        """
+        Sherman-Morrison factorization of a cyclic tridiagonal matrix,
+        correction vector is computed once
+        """
+        self._gamma = -diag[..., 0]
+        self._beta = lower[..., 0]
+        alpha = upper[..., -1]
+        diagMod = np.copy(diag)
+        diagMod[..., 0] -= self._gamma
+        diagMod[..., -1] -= alpha * self._beta / self._gamma
+        self._factor = tridiagonalFactor(lower, diagMod, upper)
+        u = np.zeros(diag.shape)
+        u[..., 0] = self._gamma
+        u[..., -1] = alpha
+        self._z = self._factor.solve(u)
+        self._denom = 1. + self._z[..., 0] \
+            + self._beta * self._z[..., -1] / self._gamma
+        self._work = np.empty(diag.shape)  # correction, reused by solve
+
+
+    def solve(self, b, out=None):
+        y = self._factor.solve(b, out)
+        fact = (y[..., 0] + self._beta * y[..., -1] / self._gamma) / self._denom
+        np.multiply(self._z, fact[..., None], out=self._work)
+        y -= self._work
+        return y
+
+
+class blockTridiagonalFactor:
+
+    def __init__(self, lower, diag, upper):
+        """
+        block LU factorization, forward sweep of block Thomas algorithm
+        on matrix coefficients, inverses of m x m pivot blocks are stored
+        Inputs:
+        - lower, diag, upper: ndarray, blocks, shape batchShape + (n, m, m)
+        """
+        n = diag.shape[-3]
+        self._lower = np.copy(lower)
+        self._cp = np.empty(diag.shape)  # modified super diagonal blocks
+        self._rdenom = np.empty(diag.shape)  # inverse of pivot blocks
+        self._rdenom[..., 0, :, :] = np.linalg.inv(diag[..., 0, :, :])
+        self._cp[..., 0, :, :] = self._rdenom[..., 0, :, :] @ upper[..., 0, :, :]
+        for i in range(1, n):
+            self._rdenom[..., i, :, :] = np.linalg.inv(
+                diag[..., i, :, :] - lower[..., i, :, :] @ self._cp[..., i-1, :, :])
+            self._cp[..., i, :, :] = \
+                self._rdenom[..., i, :, :] @ upper[..., i, :, :]
+
+
+    def solve(self, b, out=None):
+        """return solution for right hand side b, shape batchShape + (n, m)"""
+        n = self._cp.shape[-3]
+        x = np.empty(np.broadcast(self._cp[..., 0], b).shape) \
+            if out is None else out
+        x[..., 0, :] = _matvec(self._rdenom[..., 0, :, :], b[..., 0, :])
+        for i in range(1, n):
+            x[..., i, :] = _matvec(
+                self._rdenom[..., i, :, :],
+                b[..., i, :] - _matvec(self._lower[..., i, :, :], x[..., i-1, :]))
+        for i in range(n-2, -1, -1):
+            x[..., i, :] -= _matvec(self._cp[..., i, :, :], x[..., i+1, :])
+        return x
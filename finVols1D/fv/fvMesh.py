@@ -6,6 +6,7 @@ motion of mesh prescribing boundary faces motion
 import numpy as np
 from .fvFields import fvField, surfaceField
 from .fvEquations import fvEqn
+from finVols1D.log import logger, logStep
 
 
 class fvMesh:
@@ -17,32 +18,64 @@ class fvMesh:
         - time: runTime
         """
         self.time = time
+        self._version = 0  # bumped when mesh moves
         self.Xfaces = Xfaces
-        self.nFaces = len(Xfaces)
+        self.nFaces = Xfaces.shape[-1]
         self.nCells = self.nFaces - 1
         self.Xcells = self._getCellCenters()
         self._getCellWidths()
-        self.dX0 = np.copy(self.dX)
+        self._getMetrics()
+        self.dX0 = np.copy(self.dX)  # cell widths at previous time step
+        self.dX00 = np.copy(self.dX)  # cell widths two time steps before
 
 
     def _getCellCenters(self):
         """compute cell center from cell edges"""
-        return 0.5 * (self.Xfaces[1:] + self.Xfaces[:-1])
+        return 0.5 * (self.Xfaces[..., 1:] + self.Xfaces[..., :-1])
 
 
     def _getCellWidths(self):
         """compute cell widths from cell edges"""
-        self.dX = np.abs(self.Xfaces[1:] - self.Xfaces[:-1])
+        self.dX = np.abs(self.Xfaces[..., 1:] - self.Xfaces[..., :-1])
+
+
+    def _getMetrics(self):
+        """
+        compute metrics used by operators from cell centers, faces
+        and cell widths, computed again only when mesh moves
+        """
+        self.invDX = 1. / self.dX
+        # distance between neighbour cell centers, on internal faces
+        self.dXcc = self.Xcells[..., 1:] - self.Xcells[..., :-1]
+        self.invDXcc = 1. / self.dXcc
+        # linear interpolation weight of cell i+1 on face between i and i+1
+        self.wInterp = self.dX[..., :-1] / (self.dX[..., 1:] + self.dX[..., :-1])
+        # distances from cell center to its lower and upper faces
+        self.dXlow = self.Xcells - self.Xfaces[..., :-1]
+        self.dXup = self.Xfaces[..., 1:] - self.Xcells
 
 
 class dynamicFvMesh(fvMesh):
 
-    def __init__(self, Xfaces, time):
+    motionSolvers = ("analytic", "tridiagonal")
+
+    def __init__(self, Xfaces, time, motionSolver="analytic"):
         """
         Inputs:
         - Xfaces: ndarray, mesh faces coordinates
         - time: runTime
+        - motionSolver: str, solution of laplacian of cell displacements
+            "analytic" (default), closed form, displacement is linear in
+            cumulative resistance dx / diffusivity between boundaries,
+            linear in x for a uniform diffusivity
+            "tridiagonal", matrix system assembled and solved with fvEqn
+            both give the solution of the same discrete system
         """
+        if motionSolver not in self.motionSolvers:
+            raise ValueError(
+                f"mesh motion solver not supported: {motionSolver}, "
+                + f"supported: {self.motionSolvers}")
+        self.motionSolver = motionSolver
         super(dynamicFvMesh, self).__init__(Xfaces, time)
         # field of cell center displacements
         self.dXc = fvField(
@@ -58,7 +91,7 @@ class dynamicFvMesh(fvMesh):
         self.diff = surfaceField(
             "meshDiff", self, self.fvDiff)
         # matrix system to solve displacement
-        self.eqn = fvEqn(self)
+        self.eqn = fvEqn(self, cacheFactorization=True)
         # mesh velocity
         self.Umesh = fvField(
             "Umesh", self, time=self.time,
@@ -79,12 +112,38 @@ class dynamicFvMesh(fvMesh):
         """
         self.dXc.bc0.update(dX0)
         self.dXc.bcN.update(dXN)
-        self.eqn.addLaplacian(self.diff, self.dXc)
-        self.dXc.update(self.eqn.solve())
-        print("mesh motion, mean cell displacement: "
-              + f"{np.mean(self.dXc.field)} m")
+        if self.motionSolver == "analytic":
+            self._solveDisplacement(dX0, dXN)
+        else:
+            self.eqn.addLaplacian(self.diff, self.dXc)
+            self.dXc.update(self.eqn.solve(out=self.dXc.nextField))
+            self.eqn.reset()
+        if logStep(self.time):
+            logger.info("mesh motion, mean cell displacement: %s m",
+                        np.mean(self.dXc.field))
         self._updateMesh(dX0, dXN)
-        self.eqn.reset()
+
+
+    def _solveDisplacement(self, dX0, dXN):
+        """
+        closed form solution of laplacian of cell displacements,
+        flux diff * grad(dXc) is the same on all faces, so displacement
+        varies linearly with cumulative resistance from boundary 0
+        Inputs:
+        - dX0: float, displacement of boundary 0
+        - dXN: float, displacement of boundary N
+        """
+        diff = self.diff.phi
+        # resistance of each face, boundary faces at half cell width
+        res = np.empty(self.nFaces)
+        res[0] = 0.5 * self.dX[0] / diff[0]
+        res[1:-1] = self.dXcc / diff[1:-1]
+        res[-1] = 0.5 * self.dX[-1] / diff[-1]
+        np.cumsum(res, out=res)
+        disp = self.dXc.nextField
+        np.multiply(res[:-1], (dXN - dX0) / res[-1], out=disp)
+        disp += dX0
+        self.dXc.update(disp)
     
 
     def _updateMesh(self, dX0, dXN):
@@ -92,8 +151,16 @@ class dynamicFvMesh(fvMesh):
         update mesh when mesh is moving
         Inputs:
         - dX0: float, displacement of boundary 0
-        - dXN: float, displacement of boundary N"""
+        - dXN: float, displacement of boundary N
+        flux due to mesh motion is the displacement of faces divided
+        by time step, so that dX - dX0 = dt * (phiMesh[i+1] - phiMesh[i])
+        and geometric conservation law holds exactly
+        """
+        dt = self.time.time - self.time.time_1
+        self.dX00 = self.dX0
         self.dX0 = np.copy(self.dX)
+        phiMesh = self.phiMesh.phi
+        phiMesh[...] = self.Xfaces  # old faces positions
         # change cell positions
         self.Xcells += self.dXc[:]
         self.Xfaces[1:-1] = 0.5 * (self.Xcells[1:] + self.Xcells[:-1])
@@ -101,11 +168,12 @@ class dynamicFvMesh(fvMesh):
         self.Xfaces[-1] += dXN
         # compute new cell widths
         self._getCellWidths()
-        self.Umesh.update(self.dXc[:] / (
-            self.time.time - self.time.time_1))
-        self.Umesh.bc0.update(dX0 / (
-            self.time.time - self.time.time_1))
-        self.Umesh.bcN.update(dXN / (
-            self.time.time - self.time.time_1))
-        self.phiMesh.update(self.Umesh)
+        self._getMetrics()
+        self._version += 1
+        self.Umesh.update(self.dXc[:] / dt)
+        self.Umesh.bc0.update(dX0 / dt)
+        self.Umesh.bcN.update(dXN / dt)
+        np.subtract(self.Xfaces, phiMesh, out=phiMesh)
+        phiMesh /= dt
+        self.phiMesh._version += 1
         
@@ -0,0 +1,171 @@
+"""
+Outer iterations for equations whose coefficients depend on the solved field
+"""
+
+import numpy as np
+from finVols1D.log import logger, logStep
+
+
+class fvNonlinearSolver:
+
+    def __init__(self, eqn, field, assemble, solverDict=None):
+        """
+        Solve A(U) U = b(U) at current time step, matrix and
+        source vector are assembled for each iterate of U
+            Uiter = Ufield.clone()
+            phiU = fv.surfaceField("u", mesh, Uiter)
+            def assemble(eqn, Uiter):
+                phiU.update(Uiter)
+                eqn.addDdt(Ufield)
+                eqn.addDiv(phiU, Ufield)
+            nonlinear = fvNonlinearSolver(UEqn, Ufield, assemble, {"method":"newton"})
+            Ufield.update(nonlinear.solve(Uiter))
+        Inputs:
+            eqn: fvEqn, storage of matrix system, reused at each iteration
+            field: fvField, solved field, its values are the first iterate
+            assemble: callable assemble(eqn, iterField), add all terms
+                of equation with coefficients computed from iterField
+            solverDict: dict, entries
+                method: "picard" (default) or "newton"
+                tol: float, tolerance on normalized residual, default 1e-8
+                relTol: float, tolerance relative to initial residual,
+                    default 0
+                maxIter: int, maximum number of iterations, default 20
+        Residual is the L2 norm of A U - b divided by L2 norm of b.
+        Newton Jacobian is computed by finite differences, coefficients
+        of a cell must depend only on the cell and its neighbours
+        """
+        if solverDict is None:
+            solverDict = {}
+        self._eqn = eqn
+        self._field = field
+        self._assemble = assemble
+        self._method = solverDict.get("method", "picard")
+        if self._method not in ("picard", "newton"):
+            raise ValueError(
+                f"nonlinear solver method not supported: {self._method}")
+        self._tol = solverDict.get("tol", 1e-8)
+        self._relTol = solverDict.get("relTol", 0.)
+        self._maxIter = solverDict.get("maxIter", 20)
+        self._J = None  # Jacobian, same storage as equation matrix
+        self.initialResidual = None
+        self.finalResidual = None
+        self.nIter = 0
+
+
+    def solve(self, iterField=None):
+        """
+        return converged values of field
+        Inputs:
+            iterField: fvField, field holding iterates, passed to assemble,
+                default is a clone of field
+        """
+        if iterField is None:
+            iterField = self._field.clone()
+        iterField.field = np.copy(self._field.field)
+        for it in range(self._maxIter + 1):
+            residual = self._residual(iterField)
+            res = self._norm(residual)
+            if it == 0:
+                self.initialResidual = res
+            if res <= self._tol or res <= self._relTol * self.initialResidual:
+                break
+            if it == self._maxIter:
+                logger.warning(
+                    "nonlinear solver for %s did not converge in %d iterations,"
+                    + " residual=%.3e", self._field.name, self._maxIter, res)
+                break
+            if self._method == "picard":
+                iterField.field = self._solveLinear(
+                    self._eqn._Amat, self._eqn._Bvec)
+            else:
+                self._jacobian(iterField, residual)
+                iterField.field = iterField.field \
+                    - self._solveLinear(self._J, residual)
+        self.finalResidual = res
+        self.nIter = it
+        if logStep(self._field.time):
+            logger.info(
+                "- %s solver for %s: initial residual=%.3e, "
+                + "final residual=%.3e, iterations=%d",
+                self._method, self._field.name, self.initialResidual,
+                self.finalResidual, self.nIter)
+        return iterField.field
+
+
+    def _residual(self, iterField):
+        """assemble system at iterate and return A U - b"""
+        self._eqn.reset()
+        self._assemble(self._eqn, iterField)
+        self._eqn._finalize()
+        return self._eqn._Amat.matvec(iterField.field) - self._eqn._Bvec
+
+
+    def _norm(self, residual):
+        """L2 norm of residual normalized by source vector, max over batch"""
+        normB = np.linalg.norm(self._eqn._Bvec, axis=-1)
+        normB = np.where(normB > 0., normB, 1.)
+        return np.max(np.linalg.norm(residual, axis=-1) / normB)
+
+
+    def _solveLinear(self, Amat, b):
+        if self._eqn._solver is None:
+            return Amat.solve(b)
+        return self._eqn._solver.solve(Amat, b)
+
+
+    def _colours(self, n, cyclic):
+        """
+        return colour of each cell, cells of a colour are at least
+        3 cells apart so their perturbations do not overlap in residual
+        """
+        colours = np.arange(n) % 3
+        if cyclic and n % 3 != 0:
+            # cells closing the periodic loop get their own colours
+            nLast = n % 3
+            colours[n-nLast:] = 3 + np.arange(nLast)
+        return colours
+
+
+    def _jacobian(self, iterField, residual):
+        """
+        fill Jacobian of A U - b with finite differences, one residual
+        evaluation per colour of cells
+        """
+        Amat = self._eqn._Amat
+        if Amat.name not in ("tridiagonal", "cyclicTridiagonal", "dense"):
+            raise ValueError(
+                f"newton method not available for {Amat.name} matrix")
+        if self._J is None or self._J.name != Amat.name:
+            self._J = Amat.copy()
+        self._J.reset()
+        n = Amat.n
+        cyclic = self._field.bc0.name == "cyclic"
+        colours = self._colours(n, cyclic)
+        U = np.copy(iterField.field)
+        eps = np.sqrt(np.finfo(float).eps) * (1. + np.abs(U))
+        cells = np.arange(n)
+        for colour in range(colours.max() + 1):
+            perturbed = colours == colour
+            iterField.field = U + eps * perturbed
+            dR = self._residual(iterField) - residual
+            # entry (i, j) for perturbed cell j next to cell i
+            for k in (-1, 0, 1):
+                cols = cells + k
+                if cyclic:
+                    cols %= n
+                valid = (cols >= 0) & (cols < n)
+                rows = cells[valid][perturbed[cols[valid]]]
+                self._setEntries(
+                    rows, k, dR[..., rows] / eps[..., (rows+k) % n])
+        iterField.field = U
+
+
+    def _setEntries(self, rows, k, values):
+        """set entries (rows, rows+k) of Jacobian"""
+        J = self._J
+        if J.name == "dense":
+            J.A[..., rows, (rows+k) % J.n] = values
+        else:
+            arr = {-1:J.lower, 0:J.diag, 1:J.upper}[k]
+            arr[..., rows] = values
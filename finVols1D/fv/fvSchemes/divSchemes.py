@@ -2,6 +2,7 @@
 class to manage various divergence schemes
 """
 
+import numpy as np
 from finVols1D.fv.fvTools import getGradCells
 from abc import ABC, abstractmethod
 
@@ -37,11 +38,15 @@ class linear(divScheme):
         - field: fvField, variable
         """
         mesh = field.mesh
-        for i in range(1, mesh.nFaces-1):
-            eqn._Amat[i-1, i] += phi[i] * mesh.dX[i-1] / (mesh.dX[i] + mesh.dX[i-1])
-            eqn._Amat[i-1, i-1] += phi[i] * mesh.dX[i] / (mesh.dX[i] + mesh.dX[i-1])
-            eqn._Amat[i, i] -= phi[i] * mesh.dX[i-1] / (mesh.dX[i] + mesh.dX[i-1])
-            eqn._Amat[i, i-1] -= phi[i] * mesh.dX[i] / (mesh.dX[i] + mesh.dX[i-1])
+        flux = phi.phi[..., 1:-1]
+        # weight of neighbour cell, face i is between cells i-1 and i
+        w = mesh.wInterp
+        diag = np.zeros(field.field.shape)
+        diag[..., :-1] += flux * (1. - w)
+        diag[..., 1:] -= flux * w
+        eqn._Amat.addDiag(diag)
+        eqn._Amat.addDiag(flux * w, k=1)
+        eqn._Amat.addDiag(-flux * (1. - w), k=-1)
 
 
     def addRhoDiv(self, eqn, rho, phi, field):
@@ -52,12 +57,7 @@ class linear(divScheme):
         - phi: surfaceField, flux through faces
         - field: fvField, variable
         """
-        mesh = field.mesh
-        for i in range(1, mesh.nFaces-1):
-            eqn._Amat[i-1, i] += phi[i] * mesh.dX[i-1] / (mesh.dX[i] + mesh.dX[i-1])
-            eqn._Amat[i-1, i-1] += phi[i] * mesh.dX[i] / (mesh.dX[i] + mesh.dX[i-1])
-            eqn._Amat[i, i] -= phi[i] * mesh.dX[i-1] / (mesh.dX[i] + mesh.dX[i-1])
-            eqn._Amat[i, i-1] -= phi[i] * mesh.dX[i] / (mesh.dX[i] + mesh.dX[i-1])
+        self.addDiv(eqn, phi, field)
 
 
 # - - - UPWIND SCHEME - - - #
@@ -72,13 +72,20 @@ class upwind(divScheme):
         - phi: surfaceField, flux through faces
         - field: fvField, variable
         """
-        for i in range(1, field.mesh.nFaces-1):
-            if phi[i] >= 0:
-                eqn._Amat[i-1, i-1] += phi[i]
-                eqn._Amat[i, i-1] -= phi[i]
-            else:
-                eqn._Amat[i, i] -= phi[i]
-                eqn._Amat[i-1, i] += phi[i]
+        flux = phi.phi[..., 1:-1]
+        # face i is between cells i-1 and i, upwind cell depends on flux sign
+        # coefficients are computed in work arrays of eqn, no allocation
+        fluxPos, fluxNeg = eqn._faceWork
+        np.maximum(flux, 0., out=fluxPos)
+        np.minimum(flux, 0., out=fluxNeg)
+        diag = eqn._cellWork[0]
+        diag[..., :-1] = fluxPos
+        diag[..., -1] = 0.
+        diag[..., 1:] -= fluxNeg
+        eqn._Amat.addDiag(diag)
+        np.negative(fluxPos, out=fluxPos)
+        eqn._Amat.addDiag(fluxPos, k=-1)
+        eqn._Amat.addDiag(fluxNeg, k=1)
 
 
 # - - - LINEAR-UPWIND SCHEME - - - #
@@ -95,15 +102,90 @@ class linearUpwind(upwind):
         """
         super(linearUpwind, self).addDiv(eqn, phi, field)
         mesh = field.mesh
+        flux = phi.phi[..., 1:-1]
         grad = getGradCells(field)
-        for i in range(1, mesh.nFaces-1):
-            if phi[i]>=0:
-                eqn._Bvec[i] += (
-                    mesh.Xfaces[i]-mesh.Xcells[i-1]) * grad[i-1]
-                eqn._Bvec[i] -= (
-                    mesh.Xfaces[i]-mesh.Xcells[i-1]) * grad[i-1]
-            elif phi[i]<0:
-                eqn._Bvec[i] += (
-                    mesh.Xfaces[i]-mesh.Xcells[i-1]) * grad[i]
-                eqn._Bvec[i] -= (
-                    mesh.Xfaces[i]-mesh.Xcells[i-1]) * grad[i]
+        # explicit correction from upwind cell value to face value
+        gradUp = np.where(flux >= 0, grad[..., :-1], grad[..., 1:])
+        # distance from upwind cell center to face
+        dXup = np.where(flux >= 0, mesh.dXup[..., :-1], -mesh.dXlow[..., 1:])
+        corr = flux * dXup * gradUp
+        eqn._Bvec[..., :-1] -= corr
+        eqn._Bvec[..., 1:] += corr
+
+
+# - - - TVD SCHEMES - - - #
+
+class tvdScheme(upwind):
+    """
+    Implicit upwind scheme with an explicit limited correction towards
+    linear interpolation, face value is
+        U_f = U_C + lim(r) * w * (U_D - U_C)
+    C upwind cell, D downwind cell, w linear weight of D, lim(r) = 0 is
+    upwind and lim(r) = 1 linear. Limiter values are stored in eqn._lim
+    """
+
+    def addDiv(self, eqn, phi, field):
+        """
+        Inputs:
+        - eqn: fvEqn, equation to modify
+        - phi: surfaceField, flux through faces
+        - field: fvField, variable
+        """
+        super(tvdScheme, self).addDiv(eqn, phi, field)
+        mesh = field.mesh
+        flux = phi.phi[..., 1:-1]
+        U = field.field
+        grad = getGradCells(field)
+        pos = flux >= 0
+        UC = np.where(pos, U[..., :-1], U[..., 1:])
+        UD = np.where(pos, U[..., 1:], U[..., :-1])
+        # distance from upwind to downwind cell center
+        dXCD = np.where(pos, mesh.dXcc, -mesh.dXcc)
+        gradC = np.where(pos, grad[..., :-1], grad[..., 1:])
+        # ratio of upwind to local gradient, from upwind cell gradient
+        dU = UD - UC
+        r = np.divide(
+            2 * gradC * dXCD, dU, out=np.zeros(dU.shape),
+            where=np.abs(dU) > 1e-300) - 1
+        lim = self.limiter(r)
+        eqn._lim[..., 1:-1] = lim
+        w = np.where(pos, mesh.dXup[..., :-1], mesh.dXlow[..., 1:]) \
+            * mesh.invDXcc
+        corr = flux * lim * w * dU
+        eqn._Bvec[..., :-1] -= corr
+        eqn._Bvec[..., 1:] += corr
+
+
+    @abstractmethod
+    def limiter(self, r):
+        """return limiter values for ratio of gradients r"""
+
+
+@divScheme.register_divScheme_type("minmod")
+class minmod(tvdScheme):
+
+    def limiter(self, r):
+        return np.maximum(0., np.minimum(r, 1.))
+
+
+@divScheme.register_divScheme_type("vanLeer")
+class vanLeer(tvdScheme):
+
+    def limiter(self, r):
+        return (r + np.abs(r)) / (1. + np.abs(r))
+
+
+@divScheme.register_divScheme_type("superbee")
+class superbee(tvdScheme):
+
+    def limiter(self, r):
+        return np.maximum.reduce(
+            [np.zeros(r.shape), np.minimum(2*r, 1.), np.minimum(r, 2.)])
+
+
+@divScheme.register_divScheme_type("MUSCL")
+class MUSCL(tvdScheme):
+
+    def limiter(self, r):
+        return np.maximum(
+            0., np.minimum.reduce([2*r, 0.5*(1. + r), 2*np.ones(r.shape)]))
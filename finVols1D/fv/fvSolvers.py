@@ -0,0 +1,235 @@
+"""
+Linear solvers for matrix systems of finite volume equations
+"""
+
+import numpy as np
+from abc import ABC, abstractmethod
+from finVols1D.fv.fvMatrices import denseFactor
+
+
+class fvSolver(ABC):
+
+    solver_types = {}
+    @classmethod
+    def register_solver_type(cls, solver_type):
+        def decorator(subclass):
+            cls.solver_types[solver_type] = subclass
+            return subclass
+        return decorator
+
+    @classmethod
+    def create(cls, solverDict):
+        """
+        Inputs:
+        - solverDict: str or dict, solver type and options
+            {"type":"bicgstab", "preconditioner":"ilu", "tol":1e-10}
+        """
+        if isinstance(solverDict, str):
+            solverDict = {"type":solverDict}
+        if solverDict["type"] not in cls.solver_types:
+            raise ValueError(
+                "linear solver type not supported: " + solverDict["type"])
+        return cls.solver_types[solverDict["type"]](solverDict)
+
+    # matrix storage types the solver can handle, first one is preferred
+    matrixTypes = ("tridiagonal", "cyclicTridiagonal", "dense")
+    # True if factorization can be stored and reused
+    canFactorize = True
+    # True if systems of a batchFvMesh can be solved at once
+    batchSolve = False
+
+    def __init__(self, solverDict):
+        self.name = solverDict["type"]
+
+
+    def check(self, Amat):
+        """
+        raise error if matrix storage is not supported by solver
+        or if matrix holds a batch of systems the solver can not handle
+        """
+        if Amat.name not in self.matrixTypes:
+            raise ValueError(
+                f"linear solver {self.name} does not support "
+                + f"{Amat.name} matrix, supported: {self.matrixTypes}")
+        if Amat.batchShape and not self.batchSolve:
+            raise ValueError(
+                f"linear solver {self.name} does not support batch of "
+                + f"systems, matrix batch shape {Amat.batchShape}, "
+                + "use dense or thomas solver")
+
+
+    @abstractmethod
+    def solve(self, Amat, b):
+        """
+        return solution x of A x = b
+        Inputs:
+        - Amat: fvMatrix
+        - b: ndarray, right hand side
+        """
+
+
+    def factorize(self, Amat):
+        """
+        return factorization of matrix with a solve(b, out=None) method
+        Inputs:
+        - Amat: fvMatrix
+        """
+        return Amat.factorize()
+
+
+# - - - DENSE LAPACK SOLVER - - - #
+
+@fvSolver.register_solver_type("dense")
+class denseSolver(fvSolver):
+
+    matrixTypes = ("dense", "tridiagonal", "cyclicTridiagonal")
+    batchSolve = True
+
+    def solve(self, Amat, b):
+        if Amat.name == "dense":
+            return Amat.solve(b)
+        return np.linalg.solve(Amat.toDense(), b)
+
+
+    def factorize(self, Amat):
+        if Amat.name == "dense":
+            return Amat.factorize()
+        return denseFactor(Amat.toDense())
+
+
+# - - - THOMAS ALGORITHM - - - #
+
+@fvSolver.register_solver_type("thomas")
+class thomasSolver(fvSolver):
+
+    matrixTypes = ("tridiagonal", "cyclicTridiagonal")
+    batchSolve = True
+
+    def solve(self, Amat, b):
+        return Amat.solve(b)
+
+
+# - - - BANDED LAPACK SOLVER - - - #
+
+@fvSolver.register_solver_type("banded")
+class bandedSolver(fvSolver):
+
+    matrixTypes = ("tridiagonal",)
+
+    def solve(self, Amat, b):
+        from scipy.linalg import solve_banded
+        ab = np.zeros((3, Amat.n))
+        ab[0, 1:] = Amat.upper[:-1]
+        ab[1] = Amat.diag
+        ab[2, :-1] = Amat.lower[1:]
+        return solve_banded((1, 1), ab, b)
+
+
+# - - - SPARSE DIRECT SOLVER - - - #
+
+@fvSolver.register_solver_type("sparseDirect")
+class sparseDirectSolver(fvSolver):
+
+    def __init__(self, solverDict):
+        """
+        Inputs:
+        - solverDict: dict, entries
+            method: "spsolve" (default) or "splu"
+        """
+        super(sparseDirectSolver, self).__init__(solverDict)
+        self._method = solverDict.get("method", "spsolve")
+        if self._method not in ("spsolve", "splu"):
+            raise ValueError(
+                "sparse direct method not supported: " + self._method)
+
+
+    def solve(self, Amat, b):
+        from scipy.sparse import linalg
+        A = Amat.toSparse()
+        if self._method == "splu":
+            return linalg.splu(A).solve(b)
+        return linalg.spsolve(A, b)
+
+
+    def factorize(self, Amat):
+        return sparseFactor(Amat)
+
+
+class sparseFactor:
+
+    def __init__(self, Amat):
+        """sparse LU factorization with the interface of fvMatrices factors"""
+        from scipy.sparse import linalg
+        self._lu = linalg.splu(Amat.toSparse())
+
+
+    def solve(self, b, out=None):
+        x = self._lu.solve(b)
+        if out is None:
+            return x
+        out[...] = x
+        return out
+
+
+# - - - ITERATIVE SOLVERS - - - #
+
+class iterativeSolver(fvSolver):
+
+    canFactorize = False
+
+    def __init__(self, solverDict):
+        """
+        Inputs:
+        - solverDict: dict, entries
+            preconditioner: None (default), "jacobi" or "ilu"
+            tol: float, relative tolerance, default 1e-8
+            maxIter: int, maximum number of iterations, default None
+        """
+        super(iterativeSolver, self).__init__(solverDict)
+        self._precond = solverDict.get("preconditioner")
+        if self._precond not in (None, "jacobi", "ilu"):
+            raise ValueError(
+                "preconditioner not supported: " + self._precond)
+        self._tol = solverDict.get("tol", 1e-8)
+        self._maxIter = solverDict.get("maxIter")
+
+
+    def _preconditioner(self, A):
+        """return preconditioner as a scipy LinearOperator"""
+        from scipy.sparse import linalg
+        if self._precond == "jacobi":
+            invDiag = 1. / A.diagonal()
+            return linalg.LinearOperator(
+                A.shape, matvec=lambda x: invDiag * x)
+        elif self._precond == "ilu":
+            return linalg.LinearOperator(
+                A.shape, matvec=linalg.spilu(A).solve)
+        return None
+
+
+    def solve(self, Amat, b):
+        A = Amat.toSparse()
+        x, info = self._iterate(
+            A, b, rtol=self._tol, maxiter=self._maxIter,
+            M=self._preconditioner(A))
+        if info != 0:
+            raise RuntimeError(
+                f"linear solver {self.name} did not converge, info={info}")
+        return x
+
+
+@fvSolver.register_solver_type("cg")
+class cgSolver(iterativeSolver):
+    """conjugate gradient, matrix must be symmetric positive definite"""
+
+    def _iterate(self, *args, **kwargs):
+        from scipy.sparse.linalg import cg
+        return cg(*args, **kwargs)
+
+
+@fvSolver.register_solver_type("bicgstab")
+class bicgstabSolver(iterativeSolver):
+
+    def _iterate(self, *args, **kwargs):
+        from scipy.sparse.linalg import bicgstab
+        return bicgstab(*args, **kwargs)
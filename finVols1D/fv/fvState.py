@@ -0,0 +1,135 @@
+"""
+Case state stored in a single contiguous buffer,
+current values of registered fields are views into the buffer
+"""
+
+import numpy as np
+
+
+class fvState:
+
+    layouts = ("SoA", "AoS")
+
+    def __init__(self, fields=(), surfaceFields=(), layout="SoA"):
+        """
+        Allocate current values of fields in one buffer, fields keep
+        working as fvField and surfaceField, whole state operations
+        (norms, snapshots, I/O) act on a single array without copy
+            state = fvState([U, C], [phiU])
+            snap = state.snapshot()
+            ...
+            state.restore(snap)
+        Inputs:
+        - fields: list of fvField, current values are stored in buffer,
+            previous time levels are kept by fields
+        - surfaceFields: list of surfaceField
+        - layout: str, "SoA" (default), values of a field are contiguous,
+            buffer is 1D, fields follow each other in registration order
+            "AoS", values of all fields at a cell are contiguous, buffer
+            has shape (..., nFaces, nFields), cell fields do not use
+            the last row, which stays 0
+        Fields must be defined on the same mesh with unique names,
+        values written directly in buffer are not detected by caches
+        of fields, use restore or load to modify the whole state
+        """
+        if layout not in self.layouts:
+            raise ValueError(
+                f"state layout not supported: {layout}, "
+                + f"supported: {self.layouts}")
+        self.layout = layout
+        self._fields = list(fields)
+        self._surfaceFields = list(surfaceFields)
+        allFields = self._fields + self._surfaceFields
+        if len(allFields) == 0:
+            raise ValueError("fvState needs at least one field")
+        self.mesh = allFields[0].mesh
+        self.names = []
+        for field in allFields:
+            if field.mesh is not self.mesh:
+                raise ValueError(
+                    f"field {field.name} is not defined on mesh of fvState")
+            if field.name in self.names:
+                raise ValueError(
+                    f"field name {field.name} is used twice in fvState")
+            self.names.append(field.name)
+        self._allocate()
+
+
+    def _allocate(self):
+        """allocate buffer and replace values of fields by views"""
+        cellShape = self.mesh.Xcells.shape
+        faceShape = self.mesh.Xfaces.shape
+        shapes = [cellShape] * len(self._fields) \
+            + [faceShape] * len(self._surfaceFields)
+        if self.layout == "SoA":
+            sizes = [int(np.prod(shape)) for shape in shapes]
+            self.buffer = np.zeros(sum(sizes))
+            offsets = np.cumsum([0] + sizes)
+            views = [self.buffer[offsets[k]:offsets[k+1]].reshape(shape)
+                     for k, shape in enumerate(shapes)]
+        else:
+            self.buffer = np.zeros(faceShape + (len(shapes),))
+            nCells = cellShape[-1]
+            views = [self.buffer[..., :nCells, k] if shape == cellShape
+                     else self.buffer[..., k]
+                     for k, shape in enumerate(shapes)]
+        self._views = dict(zip(self.names, views))
+        for field, view in zip(self._fields, views):
+            np.copyto(view, field._current)
+            field._current = view
+        for field, view in zip(self._surfaceFields, views[len(self._fields):]):
+            np.copyto(view, field.phi)
+            field.phi = view
+
+
+    def __getitem__(self, name):
+        """return view on current values of field name"""
+        return self._views[name]
+
+
+    def norm(self, ord=None):
+        """
+        return norm of whole state as a flat vector
+        Inputs:
+        - ord: order of norm, see numpy.linalg.norm, default L2
+        """
+        return np.linalg.norm(self.buffer.reshape(-1), ord=ord)
+
+
+    def snapshot(self):
+        """return copy of whole state"""
+        return np.copy(self.buffer)
+
+
+    def restore(self, values):
+        """
+        copy values in whole state, fields are marked as modified
+        Inputs:
+        - values: ndarray, state returned by snapshot
+        """
+        np.copyto(self.buffer, values)
+        for field in self._fields + self._surfaceFields:
+            field._version += 1
+
+
+    def save(self, path):
+        """
+        write whole state in a .npy file
+        Inputs:
+        - path: str, .npy file
+        """
+        np.save(path, self.buffer)
+
+
+    def load(self, path):
+        """
+        read whole state written by save
+        Inputs:
+        - path: str, .npy file
+        """
+        values = np.load(path)
+        if values.shape != self.buffer.shape:
+            raise ValueError(
+                f"state in {path} has shape {values.shape}, "
+                + f"expected {self.buffer.shape}")
+        self.restore(values)
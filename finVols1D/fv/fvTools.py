@@ -12,7 +12,7 @@ def courantNo(phi, dt):
         phi: surfaceField
         dt: float, time step
     """
-    Co = np.abs(phi[1:-1]) * dt / np.abs(phi.mesh.Xcells[1:] - phi.mesh.Xcells[:-1])
+    Co = np.abs(phi[..., 1:-1] * phi.mesh.invDXcc) * dt
     meanCo, maxCo, minCo = np.mean(Co), np.max(Co), np.min(Co)
     return meanCo, maxCo, minCo
     
@@ -24,37 +24,63 @@ def linInterp(mesh, field):
         mesh: fvMesh
         field: fvField, field to interpolate
     """
-    phiLI = mesh.dX[1:] * field[:-1] + mesh.dX[:-1] * field[1:]
-    phiLI /= (mesh.dX[1:] + mesh.dX[:-1])
+    # exact for uniform field on any mesh
+    phiLI = field[..., 1:] - field[..., :-1]
+    phiLI *= mesh.wInterp
+    phiLI += field[..., :-1]
     return phiLI
 
 
+def getFaceValues(field):
+    """
+    return values of field on all faces, linear interpolation on
+    internal faces and boundary conditions, cached until field changes
+    Inputs:
+    - field: fvField
+    """
+    return field.cached(
+        "faceValues",
+        lambda f: finVols1D.fv.fvFields.surfaceField("phi", f.mesh, f).phi)
+
+
 def getGradCells(field):
     """
     compute gradient of field at cell centers from faces values
     linear interpolation is used to get phi on faces
+    result is cached until field changes
     Inputs:
     - field: fvField
     """
+    return field.cached("gradCells", _gradCells)
+
+
+def _gradCells(field):
     mesh = field.mesh
-    # get surfaceField, linear interpolation and BC
-    phi = finVols1D.fv.fvFields.surfaceField("phi", field.mesh, field)
-    
-    grad = np.zeros(mesh.nCells)  # gradient at cell centers
-    grad += phi[1:]
-    grad -= phi[:-1]
-    grad /= mesh.dX
+    phi = getFaceValues(field)
+    grad = np.zeros(field.field.shape)  # gradient at cell centers
+    grad += phi[..., 1:]
+    grad -= phi[..., :-1]
+    grad *= mesh.invDX
     return grad
 
 
 def getGradFaces(field):
     """
     compute gradient of field on mesh faces
-    from values of phi at neighbour cells
+    from values of phi at neighbour cells,
+    boundary faces from boundary conditions
+    result is cached until field changes
     Inputs:
     - field: fvField
     """
+    return field.cached("gradFaces", _gradFaces)
+
+
+def _gradFaces(field):
     mesh = field.mesh
-    grad = np.zeros(mesh.nFaces)
-    #grad[1:-1] = (field[1:] - field[:-1]) / (Zcells[1:] - Zcells[:-1])
+    grad = np.zeros(mesh.Xfaces.shape)
+    grad[..., 1:-1] = (field.field[..., 1:] - field.field[..., :-1]) \
+        * mesh.invDXcc
+    grad[..., 0] = field.bc0.gradBC(field)
+    grad[..., -1] = field.bcN.gradBC(field)
     return grad
@@ -0,0 +1,40 @@
+"""
+Logging of solver messages
+per time step diagnostics are sampled every interval iterations
+"""
+
+import sys
+import logging
+
+logger = logging.getLogger("finVols1D")
+_interval = 1  # iterations between two logged time steps
+
+
+def setLogLevel(level, interval=1, stream=None):
+    """
+    Inputs:
+    - level: int or str, logging level, "INFO" shows time step diagnostics
+        such as Courant numbers, "WARNING" (default) only shows warnings
+    - interval: int, diagnostics are logged every interval iterations
+    - stream: file object, default is sys.stdout
+    """
+    global _interval
+    logger.setLevel(level)
+    _interval = interval
+    if not logger.handlers:
+        handler = logging.StreamHandler(stream or sys.stdout)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+
+
+def logStep(time, level=logging.INFO):
+    """
+    return True if diagnostics of current time step are logged,
+    diagnostics should only be computed in that case
+    Inputs:
+    - time: runTime
+    - level: int, logging level of diagnostics
+    """
+    if not logger.isEnabledFor(level):
+        return False
+    return time is None or time._iter % _interval == 0
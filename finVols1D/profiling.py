@@ -0,0 +1,178 @@
+"""
+Opt-in timing of equation terms, solves and mesh updates
+methods are wrapped only while profiling is enabled,
+when disabled original methods are restored and cost nothing
+"""
+
+import json
+import time as timer
+from functools import wraps
+
+import finVols1D.turbulenceModels
+from finVols1D.fv import fvTools
+from finVols1D.fv.fvEquations import fvEqn, fvEqnTemplate
+from finVols1D.fv.fvFields import surfaceField
+from finVols1D.fv.fvMesh import dynamicFvMesh
+from finVols1D.fv.fvBoundaries import fvBC
+from finVols1D.fv.fvSchemes import divSchemes
+
+
+class fvProfiler:
+
+    _active = None  # profiler currently enabled
+
+    def __init__(self):
+        """
+        Record wall time and number of calls of each term type,
+        times are inclusive, addDiv contains div scheme and BC times
+            prof = fvProfiler()
+            with prof:
+                while time.loop(): ...
+            print(prof.summary())
+        """
+        self.stats = {}  # label: [number of calls, wall time]
+        self.wallTime = 0.
+        self._patched = []  # (owner, attribute, original or None)
+        self._inside = set()  # groups of wrapped methods being called
+        self._start = None
+
+
+    def _targets(self):
+        """
+        return list of (owner, attribute, label, group) to time,
+        methods of registered schemes and boundary conditions are
+        wrapped on each registered class, inherited ones included,
+        so that each of them is timed under its own name
+        """
+        targets = [
+            (fvEqn, "addDdt", "addDdt", None),
+            (fvEqn, "addRhoDdt", "addRhoDdt", None),
+            (fvEqn, "addDiv", "addDiv", None),
+            (fvEqn, "addRhoDiv", "addRhoDiv", None),
+            (fvEqn, "addLaplacian", "addLaplacian", None),
+            (fvEqn, "addSource", "addSource", None),
+            (fvEqn, "solve", "solve", None),
+            (fvEqnTemplate, "assemble", "assemble", None),
+            (surfaceField, "update", "surfaceField.update", None),
+            (dynamicFvMesh, "meshMotion", "meshMotion", None),
+        ]
+        for name, scheme in divSchemes.divScheme.divSchemes_types.items():
+            for method in ("addDiv", "addRhoDiv"):
+                if hasattr(scheme, method):
+                    targets.append(
+                        (scheme, method, f"{method}:{name}", "div." + method))
+        for name, bc in fvBC.BC_types.items():
+            for method in ("correctBCdiv", "correctBClaplacian"):
+                if hasattr(bc, method):
+                    targets.append(
+                        (bc, method, f"{method}:{name}", "bc." + method))
+        # getGradCells is imported by name in several modules
+        for module in (fvTools, divSchemes, finVols1D.turbulenceModels):
+            if hasattr(module, "getGradCells"):
+                targets.append(
+                    (module, "getGradCells", "getGradCells", None))
+        return targets
+
+
+    def _wrap(self, func, label, group=None):
+        """
+        return func recording its calls under label, a call made inside
+        a call of the same group, parent method called through super,
+        is only counted in label of the outer call
+        """
+        stat = self.stats.setdefault(label, [0, 0.])
+        inside = self._inside
+
+        @wraps(func)
+        def timed(*args, **kwargs):
+            if group is not None:
+                if group in inside:
+                    return func(*args, **kwargs)
+                inside.add(group)
+            t0 = timer.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                stat[0] += 1
+                stat[1] += timer.perf_counter() - t0
+                if group is not None:
+                    inside.discard(group)
+        return timed
+
+
+    def enable(self):
+        """start timing, only one profiler can be enabled at once"""
+        if fvProfiler._active is not None:
+            raise ValueError("another fvProfiler is already enabled")
+        fvProfiler._active = self
+        for owner, attr, label, group in self._targets():
+            # inherited methods are wrapped on owner, removed on disable
+            self._patched.append((owner, attr, vars(owner).get(attr)))
+            setattr(owner, attr,
+                    self._wrap(getattr(owner, attr), label, group))
+        self._start = timer.perf_counter()
+
+
+    def disable(self):
+        """stop timing and restore original methods"""
+        if fvProfiler._active is not self:
+            return
+        self.wallTime += timer.perf_counter() - self._start
+        for owner, attr, original in reversed(self._patched):
+            if original is None:
+                delattr(owner, attr)
+            else:
+                setattr(owner, attr, original)
+        self._patched = []
+        fvProfiler._active = None
+
+
+    def __enter__(self):
+        self.enable()
+        return self
+
+
+    def __exit__(self, *exc):
+        self.disable()
+
+
+    def reset(self):
+        """clear recorded times"""
+        for stat in self.stats.values():
+            stat[0], stat[1] = 0, 0.
+        self.wallTime = 0.
+
+
+    def summary(self):
+        """return table of recorded times, sorted by total time"""
+        lines = [f"{'term':<32s} {'calls':>8s} {'total (s)':>11s} "
+                 + f"{'per call (s)':>13s} {'% wall':>7s}"]
+        for label, (nCalls, total) in sorted(
+                self.stats.items(), key=lambda item: -item[1][1]):
+            if nCalls == 0:
+                continue
+            share = 100 * total / self.wallTime if self.wallTime > 0 else 0.
+            lines.append(f"{label:<32s} {nCalls:>8d} {total:>11.3e} "
+                         + f"{total/nCalls:>13.3e} {share:>7.1f}")
+        lines.append(f"{'wall time':<32s} {'':>8s} {self.wallTime:>11.3e}")
+        return "\n".join(lines)
+
+
+    def toDict(self):
+        """return recorded times as a dict"""
+        return {
+            "wallTime": self.wallTime,
+            "terms": {label: {"calls": nCalls, "time": total}
+                      for label, (nCalls, total) in self.stats.items()
+                      if nCalls > 0},
+        }
+
+
+    def toJson(self, path):
+        """
+        write recorded times in a json file
+        Inputs:
+        - path: str, json file
+        """
+        with open(path, "w") as f:
+            json.dump(self.toDict(), f, indent=2)
@@ -2,21 +2,40 @@
 Object to handle time
 """
 
+import numpy as np
+from finVols1D.fv.fvTools import courantNo
+from finVols1D.log import logger
+
 
 class runTime:
 
     def __init__(self, timeDict):
         """
+        Inputs:
+        - timeDict: dict, entries
+            startTime, endTime: float
+            dt: float, time step, initial time step if adjustTimeStep
+            dtSave: float, time interval between saves
+            adjustTimeStep: bool, time step computed from Courant number
+                of fluxes registered with addFlux, default False
+            maxCo: float, maximum Courant number, default 1
+            maxDt: float, maximum time step, default no limit, with
+                adjustTimeStep and no registered flux maxDt is required
+            maxDeltaT: float, maximum growth factor of time step
+                between two iterations, default 1.2
         """
         self._startTime = timeDict["startTime"]
         self._endTime = timeDict["endTime"]
         self._dt = timeDict["dt"]
         self._dtSave = timeDict.get("dtSave")
+        # adaptive time step
+        self._adjustTimeStep = timeDict.get("adjustTimeStep", False)
         if self._dtSave==None:
             self._dtSave = self._endTime
-            print("dtSave not defined in runTime, "
-                  + "only last time step will be saved")
-        elif self._dtSave<self._dt:
+            logger.warning("dtSave not defined in runTime, "
+                           + "only last time step will be saved")
+        elif self._dtSave<self._dt and not self._adjustTimeStep:
+            # an adaptive time step is reduced to land on save times instead
             self._dtSave = self._dt
         self.time = self._startTime
         self._iter = 0
@@ -24,14 +43,112 @@ class runTime:
         self._lastIter = round(self._endTime / self._dt)
         self.time_1 = None
         self.time_2 = None
+        self._maxCo = timeDict.get("maxCo", 1.)
+        self._maxDt = timeDict.get("maxDt", np.inf)
+        self._maxDeltaT = timeDict.get("maxDeltaT", 1.2)
+        self._fluxes = []  # surfaceFields limiting time step
+        # last time step limited by Courant number, growth and maxDt,
+        # before it is reduced to land on save and end times
+        self._dtCourant = self._dt
+        # output
+        self._writers = []
+        self._checkpoints = []
+        # save times are startTime + iSave * dtSave, computed from
+        # an integer counter so that round-off does not accumulate
+        self._iSave = 0
+        self._nextSave = self._startTime  # initial state is saved
+        self._lastSave = None
+
+
+    def addWriter(self, writer):
+        """
+        register writer called at every save time
+        Inputs:
+        - writer: fieldWriter
+        """
+        self._writers.append(writer)
+
+
+    def addCheckpoint(self, checkpoint):
+        """
+        register checkpoint called at every iteration
+        Inputs:
+        - checkpoint: checkpoint
+        """
+        self._checkpoints.append(checkpoint)
+
+
+    def writeTime(self):
+        """return True if current time is a save time"""
+        # tolerance for round-off of time accumulated over iterations
+        return self.time >= self._nextSave - 1e-6 * self._dt
+
+
+    def _write(self):
+        """call writers at save times and update next save time"""
+        if self.writeTime():
+            for writer in self._writers:
+                writer.write()
+            self._lastSave = self.time
+            while self.writeTime():
+                self._iSave += 1
+                self._nextSave = self._startTime + self._iSave * self._dtSave
+
+
+    def addFlux(self, phi):
+        """
+        register flux used to compute adaptive time step
+        Inputs:
+        - phi: surfaceField
+        """
+        self._fluxes.append(phi)
+
+
+    def _adjustDt(self):
+        """
+        compute time step from Courant number of registered fluxes
+        limited by maxDt, growth factor maxDeltaT and end time,
+        growth is applied to last Courant limited time step so that
+        steps reduced to land on save times do not slow down the run
+        """
+        if not self._fluxes and self._maxDt == np.inf:
+            raise ValueError(
+                "adjustTimeStep needs a flux registered with "
+                + "runTime.addFlux or a maxDt entry in timeDict")
+        dt = min(self._maxDeltaT * self._dtCourant, self._maxDt)
+        for phi in self._fluxes:
+            # Courant number is proportional to dt
+            maxCo = courantNo(phi, 1.)[1]
+            if maxCo > 0.:
+                dt = min(dt, self._maxCo / maxCo)
+        self._dtCourant = float(dt)
+        # next save time or end time is reached with equal steps, a gap
+        # within round-off of dt is closed instead of taking a sliver step
+        self._landTime = None
+        targets = [self._endTime]
+        if self._writers and self._nextSave > self.time:
+            targets.append(self._nextSave)
+        target = min(targets)
+        gap = target - self.time
+        nSteps = max(1, int(np.ceil(gap / dt * (1. - 1e-9))))
+        if nSteps == 1:
+            dt = gap
+            self._landTime = target
+        else:
+            dt = gap / nSteps
+        self._dt = float(dt)
 
 
-    def _updateTime(self, dt):
+    def _updateTime(self, dt, newTime=None):
         """
+        advance time by dt
+        Inputs:
+        - dt: float, time step
+        - newTime: float, time reached, set exactly to avoid round-off
         """
         self.time_2 = self.time_1
         self.time_1 = self.time
-        self.time += dt
+        self.time = self.time + dt if newTime is None else newTime
         self._iter += 1
 
 
@@ -39,10 +156,24 @@ class runTime:
         """
         return True if end time has not been reached and update time
         """
+        self._write()
+        for checkpoint in self._checkpoints:
+            checkpoint.update()
         if self.time >= self._endTime:
+            # save final state and close output
+            if self._lastSave != self.time:
+                for writer in self._writers:
+                    writer.write()
+                self._lastSave = self.time
+            for writer in self._writers:
+                writer.close()
             return False
         else:
-            self._updateTime(self._dt)
+            if self._adjustTimeStep:
+                self._adjustDt()
+                self._updateTime(self._dt, self._landTime)
+            else:
+                self._updateTime(self._dt)
             return True
 
 
@@ -0,0 +1,36 @@
+"""
+Fixtures shared by tests, factories of runTime and meshes
+"""
+
+import numpy as np
+import pytest
+
+from finVols1D import fv
+from finVols1D.runTime import runTime
+
+
+@pytest.fixture(scope="session")
+def makeTime():
+    """
+    factory of runTime, fixed time step 0.1 up to time 1 by default,
+    other entries of timeDict are given as keyword arguments
+        time = makeTime(dt=0.01, adjustTimeStep=True, maxCo=0.5)
+    """
+    def make(startTime=0., endTime=1., dt=0.1, dtSave=1., **options):
+        return runTime({"startTime":startTime, "endTime":endTime,
+                        "dt":dt, "dtSave":dtSave, **options})
+    return make
+
+
+@pytest.fixture(scope="session")
+def makeMesh(makeTime):
+    """
+    factory of meshes, a default runTime is created when time is None
+        mesh = makeMesh(np.linspace(0., 1., 11))
+        mesh = makeMesh(faces, time, meshType=fv.dynamicFvMesh)
+    """
+    def make(faces, time=None, meshType=fv.fvMesh, **options):
+        if time is None:
+            time = makeTime()
+        return meshType(np.asarray(faces, dtype=float), time, **options)
+    return make
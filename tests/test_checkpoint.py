@@ -0,0 +1,51 @@
+import numpy as np
+
+from finVols1D import fv
+from finVols1D.fieldIO import fieldWriter, fieldReader, checkpoint
+
+
+def runCase(makeTime, path, crashAt=None, restart=False):
+    """settling on a moving bed with adaptive time step and cached factors"""
+    time = makeTime(endTime=2., dt=0.05, dtSave=0.5,
+                    adjustTimeStep=True, maxCo=0.4)
+    mesh = fv.dynamicFvMesh(np.linspace(0., 0.1, 31), time)
+    C = fv.fvField("Cs", mesh, time, values=0.05,
+                   bc0={"type":"fixedGradient", "value":0.})
+    W = fv.fvField("ws", mesh, time, values=-0.01,
+                   bcN={"type":"fixedValue", "value":0.})
+    phi = fv.surfaceField("ws", mesh, W)
+    time.addFlux(phi)
+    fieldWriter(path, time, [C], mesh=mesh, chunkSize=3)
+    cp = checkpoint(path + ".npz", time, [C, W, phi], mesh=mesh, interval=7)
+    eqn = fv.fvEqn(mesh, cacheFactorization=True)
+    if restart:
+        cp.read()
+    while time.loop():
+        if time._iter == crashAt:
+            return None
+        dz = 0. if time.time_2 is None \
+            else -phi[0] * C[0] * (time.time_1 - time.time_2)
+        mesh.meshMotion(dz, 0.)
+        eqn.addDdt(C)
+        phi.update(W)
+        phi.makeRelative()
+        eqn.addDiv(phi, C, scheme="linearUpwind")
+        C.update(eqn.solve())
+        eqn.reset()
+        W.bcN.update(float(C.field[-1]) * 0.01)
+    return np.copy(C.field), np.copy(mesh.Xfaces), time.time, time._iter
+
+
+def test_restart_is_bit_for_bit(makeTime, tmp_path):
+    pathA, pathB = str(tmp_path / "A"), str(tmp_path / "B")
+    CA, XA, tA, iterA = runCase(makeTime, pathA)
+    assert runCase(makeTime, pathB, crashAt=10) is None
+    CB, XB, tB, iterB = runCase(makeTime, pathB, restart=True)
+    assert (tA, iterA) == (tB, iterB)
+    assert np.array_equal(CA, CB)
+    assert np.array_equal(XA, XB)
+    readerA, readerB = fieldReader(pathA), fieldReader(pathB)
+    assert len(readerA) == len(readerB) == 5
+    assert np.array_equal(readerA.times, readerB.times)
+    for name in ("Cs", "Xfaces"):
+        assert np.array_equal(readerA.readAll(name), readerB.readAll(name))
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from finVols1D import fv
+from finVols1D.fv.fvSchemes.divSchemes import divScheme
+
+TVD_SCHEMES = ["minmod", "vanLeer", "superbee", "MUSCL"]
+
+
+def advect(makeTime, scheme, profile, n=50, courant=0.2, duration=0.5):
+    """periodic advection at unit velocity, return mesh and final values"""
+    dt = courant / n
+    time = makeTime(dt=dt)
+    mesh = fv.fvMesh(np.linspace(0., 1., n+1), time)
+    U = fv.fvField("U", mesh, time, values=profile(mesh.Xcells),
+                   bc0={"type":"cyclic"}, bcN={"type":"cyclic"})
+    vel = fv.fvField("vel", mesh, time, values=np.ones(n))
+    phi = fv.surfaceField("vel", mesh, vel)
+    eqn = fv.fvEqn(mesh)
+    for k in range(round(duration / dt)):
+        time.loop()
+        eqn.addDdt(U)
+        eqn.addDiv(phi, U, scheme=scheme)
+        U.update(eqn.solve())
+        eqn.reset()
+    return mesh, U.field
+
+
+def squareWave(x):
+    return ((x > 0.2) & (x < 0.5)).astype(float)
+
+
+def sineWave(x):
+    return np.sin(2*np.pi*x)
+
+
+@pytest.mark.parametrize("scheme", TVD_SCHEMES)
+def test_tvd_schemes_create_no_new_extrema(makeTime, scheme):
+    mesh, U = advect(makeTime, scheme, squareWave)
+    assert U.min() >= -1e-12
+    assert U.max() <= 1. + 1e-12
+    # limited schemes are less diffusive than upwind
+    meshUp, Uup = advect(makeTime, "upwind", squareWave)
+    assert U.max() > Uup.max()
+
+
+def test_linear_upwind_more_accurate_than_upwind(makeTime):
+    errors = {}
+    for scheme in ("upwind", "linearUpwind"):
+        errors[scheme] = []
+        for n in (25, 50, 100):
+            mesh, U = advect(makeTime, scheme, sineWave, n=n)
+            exact = sineWave(mesh.Xcells - 0.5)
+            errors[scheme].append(np.abs(U - exact).max())
+    assert np.all(np.array(errors["linearUpwind"])
+                  < 0.5 * np.array(errors["upwind"]))
+    # error of linearUpwind decreases faster than first order
+    assert errors["linearUpwind"][-1] < 0.25 * errors["linearUpwind"][0]
+
+
+@pytest.mark.parametrize("scheme, expected", [
+    ("minmod", [0., 0., 1., 1.]),
+    ("vanLeer", [0., 0., 1., 4./3.]),
+    ("superbee", [0., 0., 1., 2.]),
+    ("MUSCL", [0., 0., 1., 1.5]),
+])
+def test_limiter_values(scheme, expected):
+    r = np.array([-1., 0., 1., 2.])
+    lim = divScheme.create(scheme).limiter(r)
+    assert np.allclose(lim, expected, rtol=0., atol=1e-15)
+
+
+@pytest.mark.parametrize("scheme", TVD_SCHEMES)
+def test_limiters_in_tvd_region(scheme):
+    r = np.linspace(-5., 10., 301)
+    lim = divScheme.create(scheme).limiter(r)
+    assert np.all(lim >= 0.)
+    assert np.all(lim <= np.maximum(2. * r, 0.) + 1e-15)
+    assert np.all(lim <= 2. + 1e-15)
+
+
+def test_unknown_scheme_raises():
+    with pytest.raises(ValueError):
+        divScheme.create("unknown")
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from finVols1D import fv
+
+
+@pytest.mark.parametrize("scheme", ["Euler", "BDF2", "CrankNicolson"])
+def test_uniform_field_preserved_on_moving_mesh(makeMesh, scheme):
+    mesh = makeMesh(np.linspace(0., 1., 21), meshType=fv.dynamicFvMesh)
+    time = mesh.time
+    C = fv.fvField("C", mesh, time, values=np.ones(20))
+    bc = {"type":"fixedValue", "value":0.}
+    W = fv.fvField("w", mesh, time, values=np.zeros(20), bc0=bc, bcN=bc)
+    phi = fv.surfaceField("w", mesh, W)
+    eqn = fv.fvEqn(mesh)
+    k = 0
+    while time.loop():
+        mesh.meshMotion(0.01 * np.sin(k), 0.)
+        k += 1
+        phi.update(W)
+        phi.makeRelative()
+        eqn.addDdt(C, scheme=scheme)
+        eqn.addDiv(phi, C)
+        C.update(eqn.solve())
+        eqn.reset()
+        dt = time.time - time.time_1
+        # swept volume of each cell equals its volume change
+        dPhi = mesh.phiMesh.phi[1:] - mesh.phiMesh.phi[:-1]
+        assert np.allclose(mesh.dX - mesh.dX0, dt * dPhi,
+                           rtol=0., atol=1e-15)
+    assert np.allclose(C.field, 1., rtol=0., atol=1e-13)
+
+
+@pytest.mark.parametrize("variable", [False, True])
+def test_analytic_motion_matches_tridiagonal_solve(makeMesh, variable):
+    meshes = []
+    for solver in ("analytic", "tridiagonal"):
+        mesh = makeMesh(np.linspace(0., 1., 51)**1.5,
+                        meshType=fv.dynamicFvMesh, motionSolver=solver)
+        time = mesh.time
+        if variable:
+            mesh.fvDiff.field = 1. + 10. * mesh.Xcells**2
+            mesh.diff.update(mesh.fvDiff)
+        meshes.append((time, mesh))
+    for k in range(10):
+        for time, mesh in meshes:
+            time.loop()
+            mesh.meshMotion(0.01 * np.sin(k), 0.003 * k)
+    (timeA, meshA), (timeB, meshB) = meshes
+    assert np.allclose(meshA.Xfaces, meshB.Xfaces, rtol=0., atol=1e-13)
+    assert np.allclose(meshA.dXc.field, meshB.dXc.field, rtol=0., atol=1e-13)
+
+
+def test_unknown_motion_solver_raises(makeMesh):
+    with pytest.raises(ValueError):
+        makeMesh(np.linspace(0., 1., 11), meshType=fv.dynamicFvMesh,
+                 motionSolver="unknown")
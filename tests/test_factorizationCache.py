@@ -0,0 +1,78 @@
+import numpy as np
+
+from finVols1D import fv
+from finVols1D.fv.fvMatrices import fvMatrix
+
+
+def makeCase(makeMesh, cache):
+    mesh = makeMesh(np.linspace(0., 1., 31)**1.2)
+    time = mesh.time
+    T = fv.fvField(
+        "T", mesh, time, values=np.sin(np.pi*mesh.Xcells),
+        bc0={"type":"fixedValue", "value":0.},
+        bcN={"type":"fixedValue", "value":1.})
+    D = fv.fvField("D", mesh, time, values=1. + mesh.Xcells)
+    diff = fv.surfaceField("D", mesh, D)
+    eqn = fv.fvEqn(mesh, cacheFactorization=cache)
+    return time, T, D, diff, eqn
+
+
+def step(eqn, T, diff):
+    eqn.addDdt(T)
+    eqn.addLaplacian(diff, T)
+    T.update(eqn.solve())
+    eqn.reset()
+
+
+def countCalls(monkeypatch, cls, name):
+    calls = []
+    original = getattr(cls, name)
+    def counted(self, *args, **kwargs):
+        calls.append(1)
+        return original(self, *args, **kwargs)
+    monkeypatch.setattr(cls, name, counted)
+    return calls
+
+
+def test_unchanged_key_skips_factorization_and_comparison(makeMesh, monkeypatch):
+    equals = countCalls(monkeypatch, fvMatrix, "equals")
+    factorize = countCalls(
+        monkeypatch, fvMatrix.matrix_types["tridiagonal"], "factorize")
+    time, T, D, diff, eqn = makeCase(makeMesh, True)
+    timeRef, Tref, Dref, diffRef, eqnRef = makeCase(makeMesh, False)
+    nSteps = 0
+    while time.loop():
+        timeRef.loop()
+        step(eqn, T, diff)
+        step(eqnRef, Tref, diffRef)
+        nSteps += 1
+    assert nSteps >= 10
+    assert len(factorize) == 1
+    assert len(equals) == 0
+    assert np.allclose(T.field, Tref.field, rtol=1e-12, atol=1e-14)
+
+
+def test_changed_coefficients_are_refactorized(makeMesh):
+    time, T, D, diff, eqn = makeCase(makeMesh, True)
+    timeRef, Tref, Dref, diffRef, eqnRef = makeCase(makeMesh, False)
+    for k in range(5):
+        time.loop()
+        timeRef.loop()
+        if k == 2:
+            for field, surf in ((D, diff), (Dref, diffRef)):
+                field.update(3. * field.field)
+                surf.update(field)
+        step(eqn, T, diff)
+        step(eqnRef, Tref, diffRef)
+        assert np.allclose(T.field, Tref.field, rtol=1e-12, atol=1e-14)
+
+
+def test_direct_matrix_writes_are_compared(makeMesh):
+    time, T, D, diff, eqn = makeCase(makeMesh, True)
+    for k in range(3):
+        time.loop()
+        eqn._Amat.addDiag(T.mesh.dX / 0.1 * (k + 1))
+        eqn._Bvec[...] = 1.
+        x = eqn.solve()
+        assert np.allclose(x, 0.1 / (k + 1) / T.mesh.dX)
+        eqn.reset()
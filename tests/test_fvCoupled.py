@@ -0,0 +1,127 @@
+import numpy as np
+import pytest
+
+from finVols1D import fv
+from finVols1D.fv.fvMatrices import fvMatrix
+
+
+def makeFields(mesh):
+    time = mesh.time
+    A = fv.fvField("A", mesh, time, values=np.sin(np.pi*mesh.Xcells),
+                   bc0={"type":"fixedValue", "value":1.},
+                   bcN={"type":"fixedGradient", "value":0.})
+    B = fv.fvField("B", mesh, time, values=mesh.Xcells**2,
+                   bc0={"type":"fixedGradient", "value":0.},
+                   bcN={"type":"fixedValue", "value":0.5})
+    D = fv.fvField("D", mesh, time, values=0.1 + mesh.Xcells)
+    diff = fv.surfaceField("D", mesh, D)
+    return A, B, diff
+
+
+@pytest.mark.parametrize("scheme", ["Euler", "BDF2", "CrankNicolson"])
+def test_uncoupled_system_matches_segregated_solve(makeMesh, scheme):
+    faces = np.linspace(0., 1., 31)**1.3
+    mesh, meshRef = makeMesh(faces), makeMesh(faces)
+    A, B, diff = makeFields(mesh)
+    Aref, Bref, diffRef = makeFields(meshRef)
+    coupled = fv.fvCoupledEqn(mesh, [A, B])
+    eqnA, eqnB = fv.fvEqn(meshRef), fv.fvEqn(meshRef)
+    for k in range(4):
+        mesh.time.loop()
+        meshRef.time.loop()
+        for field in (A, B):
+            coupled.eqn(field).addDdt(field, scheme=scheme)
+            coupled.eqn(field).addLaplacian(diff, field)
+        coupled.addCoupling(A, B, 0. * mesh.dX)
+        Anew, Bnew = coupled.solve()
+        A.update(Anew)
+        B.update(Bnew)
+        coupled.reset()
+        for eqn, field in ((eqnA, Aref), (eqnB, Bref)):
+            eqn.addDdt(field, scheme=scheme)
+            eqn.addLaplacian(diffRef, field)
+            field.update(eqn.solve())
+            eqn.reset()
+        assert np.allclose(A.field, Aref.field, rtol=0., atol=1e-12)
+        assert np.allclose(B.field, Bref.field, rtol=0., atol=1e-12)
+
+
+def test_crank_nicolson_averages_coupling_terms(makeMesh):
+    mesh = makeMesh(np.linspace(0., 1., 21))
+    A, B, diff = makeFields(mesh)
+    k = 3. * mesh.dX
+    dt = 0.1
+    coupled = fv.fvCoupledEqn(mesh, [A, B])
+    # operator without time derivative, read before it is solved
+    operator = fv.fvCoupledEqn(mesh, [A, B])
+    for eqn in (coupled, operator):
+        for field in (A, B):
+            eqn.eqn(field).addLaplacian(diff, field)
+        eqn.addCoupling(A, B, k)
+        eqn.addCoupling(B, A, k)
+    mesh.time.loop()
+    for field in (A, B):
+        coupled.eqn(field).addDdt(field, scheme="CrankNicolson")
+    x0 = np.stack([A.field, B.field], axis=-1)
+    b = operator._Bvec
+    L = operator._Amat.toDense()
+    M = np.diag(np.repeat(mesh.dX / dt, 2))
+    ref = np.linalg.solve(
+        M + 0.5 * L, (M - 0.5 * L) @ x0.reshape(-1) + b.reshape(-1))
+    Anew, Bnew = coupled.solve()
+    assert np.allclose(np.stack([Anew, Bnew], axis=-1).reshape(-1), ref,
+                       rtol=0., atol=1e-12)
+
+
+@pytest.mark.parametrize("batchShape", [(), (2,)])
+def test_block_thomas_matches_dense_solve(batchShape):
+    n, m = 7, 3
+    rng = np.random.default_rng(0)
+    Amat = fvMatrix.create("blockTridiagonal", n, batchShape, m=m)
+    shape = batchShape + (n, m, m)
+    Amat.addDiag(rng.uniform(-1., 1., shape[:-3] + (n-1, m, m)), k=-1)
+    Amat.addDiag(rng.uniform(-1., 1., shape[:-3] + (n-1, m, m)), k=1)
+    # diagonally dominant blocks
+    Amat.addDiag(rng.uniform(-1., 1., shape) + 8. * np.eye(m))
+    b = rng.uniform(-1., 1., batchShape + (n, m))
+    x = Amat.solve(b)
+    assert x.shape == b.shape
+    assert np.allclose(Amat.matvec(x), b, rtol=0., atol=1e-12)
+    A = Amat.toDense() if batchShape == () else None
+    if A is not None:
+        ref = np.linalg.solve(A, b.reshape(-1)).reshape(n, m)
+        assert np.allclose(x, ref, rtol=0., atol=1e-12)
+    out = np.empty(b.shape)
+    assert Amat.factorize().solve(b, out) is out
+    assert np.allclose(out, x, rtol=0., atol=1e-14)
+
+
+def test_component_is_view_on_blocks():
+    Amat = fvMatrix.create("blockTridiagonal", 4, m=2)
+    Amat.component(1, 0).addDiag(np.arange(4.))
+    Amat.component(0, 1).addDiag(np.ones(3), k=1)
+    A = Amat.toDense()
+    assert np.array_equal(np.diagonal(A, offset=-1)[::2], np.arange(4.))
+    assert np.array_equal(A[0, 3], 1.)
+    assert np.count_nonzero(A) == 6
+
+
+def test_reset_clears_block_equations(makeMesh):
+    mesh = makeMesh(np.linspace(0., 1., 11))
+    A, B, diff = makeFields(mesh)
+    coupled = fv.fvCoupledEqn(mesh, [A, B])
+    for k in range(5):
+        mesh.time.loop()
+        for field in (A, B):
+            coupled.eqn(field).addDdt(field, scheme="CrankNicolson")
+            coupled.eqn(field).addLaplacian(diff, field)
+        coupled.addCoupling(A, B, mesh.dX)
+        Anew, Bnew = coupled.solve()
+        A.update(Anew)
+        B.update(Bnew)
+        coupled.reset()
+        for eqn in coupled._eqns.values():
+            assert eqn._coefKey == []
+            assert eqn._crankNicolson is None
+        assert not np.any(coupled._Amat.diag)
+        assert not np.any(coupled._Bvec)
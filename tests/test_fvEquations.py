@@ -0,0 +1,99 @@
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from finVols1D import fv
+from finVols1D.fv.fvMatrices import fvMatrix
+
+
+def test_steady_step_does_not_allocate_mesh_arrays(makeMesh):
+    n = 10000
+    mesh = makeMesh(np.linspace(0., 1., n+1))
+    time = mesh.time
+    bc = {"type":"fixedValue", "value":0.}
+    C = fv.fvField("C", mesh, time, values=np.sin(mesh.Xcells),
+                   bc0=bc, bcN=bc)
+    vel = fv.fvField("vel", mesh, time, values=np.ones(n))
+    phi = fv.surfaceField("vel", mesh, vel)
+    D = fv.fvField("D", mesh, time, values=np.ones(n))
+    diff = fv.surfaceField("D", mesh, D)
+    eqn = fv.fvEqn(mesh)
+    def step():
+        time.loop()
+        eqn.addDdt(C)
+        eqn.addDiv(phi, C)
+        eqn.addLaplacian(diff, C)
+        C.update(eqn.solve(out=C.nextField))
+        eqn.reset()
+    for k in range(3):
+        step()
+    tracemalloc.start()
+    try:
+        for k in range(5):
+            step()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # an array of the mesh size takes 80 kB
+    assert peak < 8 * n // 4
+
+
+def makeTransport(mesh):
+    time = mesh.time
+    C = fv.fvField("C", mesh, time, values=np.exp(-50*(mesh.Xcells - 0.3)**2),
+                   bc0={"type":"fixedValue", "value":0.},
+                   bcN={"type":"fixedGradient", "value":0.})
+    vel = fv.fvField("vel", mesh, time, values=0.5 + mesh.Xcells)
+    phi = fv.surfaceField("vel", mesh, vel)
+    D = fv.fvField("D", mesh, time, values=0.01 * (1. + mesh.Xcells))
+    diff = fv.surfaceField("D", mesh, D)
+    S = fv.fvField("S", mesh, time, values=0.1 * mesh.dX)
+    return C, phi, diff, S
+
+
+@pytest.mark.parametrize("options, ddtScheme, divScheme", [
+    ({}, None, "upwind"),
+    ({"cacheFactorization":True}, "Euler", "linearUpwind"),
+    ({"cacheFactorization":True}, "CrankNicolson", "upwind"),
+    ({}, "CrankNicolson", "vanLeer"),
+    ({"matrix":"dense"}, "BDF2", "linear"),
+])
+def test_template_matches_term_sequence(makeMesh, options, ddtScheme,
+                                        divScheme):
+    faces = np.linspace(0., 1., 41)**1.2
+    mesh, meshRef = makeMesh(faces), makeMesh(faces)
+    C, phi, diff, S = makeTransport(mesh)
+    Cref, phiRef, diffRef, Sref = makeTransport(meshRef)
+    template = fv.fvEqnTemplate(mesh, C, **options) \
+        .ddt(ddtScheme).div(phi, divScheme).laplacian(diff).source(S)
+    eqn = fv.fvEqn(meshRef, **options)
+    for k in range(5):
+        mesh.time.loop()
+        meshRef.time.loop()
+        C.update(template.solve())
+        eqn.addDdt(Cref, scheme=ddtScheme)
+        eqn.addDiv(phiRef, Cref, scheme=divScheme)
+        eqn.addLaplacian(diffRef, Cref)
+        eqn.addSource(Sref)
+        Cref.update(eqn.solve())
+        eqn.reset()
+        assert np.allclose(C.field, Cref.field, rtol=0., atol=1e-13)
+
+
+def test_template_reuses_factorization(makeMesh, monkeypatch):
+    factorize = []
+    tridiagonal = fvMatrix.matrix_types["tridiagonal"]
+    original = tridiagonal.factorize
+    def counted(self):
+        factorize.append(1)
+        return original(self)
+    monkeypatch.setattr(tridiagonal, "factorize", counted)
+    mesh = makeMesh(np.linspace(0., 1., 41))
+    C, phi, diff, S = makeTransport(mesh)
+    template = fv.fvEqnTemplate(mesh, C, cacheFactorization=True) \
+        .ddt().div(phi).laplacian(diff).source(S)
+    for k in range(5):
+        mesh.time.loop()
+        C.update(template.solve(out=C.nextField))
+    assert len(factorize) == 1
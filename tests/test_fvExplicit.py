@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from finVols1D import fv
+
+FACES = np.linspace(0., 1., 41)**1.2
+
+
+def makeAdvection(makeTime, dt, profile, velocity=1.):
+    """periodic advection on a non uniform mesh, upwind spatial terms"""
+    time = makeTime(dt=dt)
+    mesh = fv.fvMesh(FACES, time)
+    U = fv.fvField("U", mesh, time, values=profile(mesh.Xcells),
+                   bc0={"type":"cyclic"}, bcN={"type":"cyclic"})
+    vel = fv.fvField("vel", mesh, time, values=velocity*np.ones(mesh.nCells))
+    phi = fv.surfaceField("vel", mesh, vel)
+    def assemble(eqn, Uiter):
+        eqn.addDiv(phi, Uiter)
+    return mesh, time, U, assemble
+
+
+def runAdvection(makeTime, dt, scheme, duration=0.1):
+    mesh, time, U, assemble = makeAdvection(
+        makeTime, dt, lambda x: np.sin(2*np.pi*x))
+    explicit = fv.fvExplicitSolver(
+        fv.fvEqn(mesh), U, assemble, {"scheme":scheme})
+    for k in range(round(duration / dt)):
+        time.loop()
+        U.update(explicit.solve())
+    return U.field
+
+
+@pytest.fixture(scope="module")
+def reference(makeTime):
+    return runAdvection(makeTime, 5e-5, "SSPRK3")
+
+
+@pytest.mark.parametrize("scheme, order", [
+    ("forwardEuler", 1), ("SSPRK2", 2), ("SSPRK3", 3),
+])
+def test_temporal_order(makeTime, reference, scheme, order):
+    errors = [np.abs(runAdvection(makeTime, dt, scheme) - reference).max()
+              for dt in (2e-3, 1e-3, 5e-4)]
+    rates = np.log2(np.array(errors[:-1]) / np.array(errors[1:]))
+    assert np.all(rates > order - 0.25)
+    assert np.all(rates < order + 0.5)
+
+
+@pytest.mark.parametrize("velocity", [1., -0.5])
+def test_stable_dt_of_upwind_advection(makeTime, velocity):
+    mesh, time, U, assemble = makeAdvection(
+        makeTime, 0.1, np.cos, velocity)
+    explicit = fv.fvExplicitSolver(fv.fvEqn(mesh), U, assemble)
+    assert explicit.stableDt() == pytest.approx(
+        np.min(mesh.dX / abs(velocity)), rel=1e-12)
+
+
+@pytest.mark.parametrize("velocity", [1., -0.5])
+def test_forward_euler_at_stable_dt_is_bounded(makeTime, velocity):
+    step = lambda x: ((x > 0.2) & (x < 0.5)).astype(float)
+    mesh, time, U, assemble = makeAdvection(makeTime, 0.1, step, velocity)
+    dt = fv.fvExplicitSolver(fv.fvEqn(mesh), U, assemble).stableDt()
+    mesh, time, U, assemble = makeAdvection(makeTime, dt, step, velocity)
+    explicit = fv.fvExplicitSolver(
+        fv.fvEqn(mesh), U, assemble, {"scheme":"forwardEuler"})
+    for k in range(100):
+        time.loop()
+        U.update(explicit.solve())
+        assert U.field.min() >= -1e-12
+        assert U.field.max() <= 1. + 1e-12
+    # mass is conserved on the periodic mesh
+    assert np.sum(U.field * mesh.dX) == pytest.approx(
+        np.sum(step(mesh.Xcells) * mesh.dX), rel=1e-12)
+
+
+@pytest.mark.parametrize("scheme", ["RK4", 3])
+def test_unknown_scheme_raises(makeTime, scheme):
+    mesh, time, U, assemble = makeAdvection(makeTime, 0.1, np.cos)
+    with pytest.raises(ValueError, match="not supported"):
+        fv.fvExplicitSolver(fv.fvEqn(mesh), U, assemble, {"scheme":scheme})
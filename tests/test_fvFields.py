@@ -0,0 +1,178 @@
+import numpy as np
+import pytest
+
+from finVols1D import fv
+from finVols1D.fv import fvTools
+
+
+@pytest.fixture
+def U(makeMesh):
+    mesh = makeMesh(np.linspace(0., 1., 11))
+    return fv.fvField("U", mesh, mesh.time, values=np.zeros(10))
+
+
+def test_update_shifts_time_levels(U):
+    current = U.field
+    assert U.field0 is None and U.field00 is None
+    for k in range(1, 5):
+        U.update(np.full(10, float(k)))
+        assert U.field is current
+        assert np.all(U.field == k)
+        assert np.all(U.field0 == k - 1)
+        if k >= 2:
+            assert np.all(U.field00 == k - 2)
+
+
+def test_next_field_does_not_hold_time_levels(U):
+    for k in range(1, 5):
+        out = U.nextField
+        out[...] = k
+        U.update(out)
+        levels = [U.field, U.field0] + ([U.field00] if k >= 2 else [])
+        assert not any(np.shares_memory(U.nextField, level) for level in levels)
+        assert np.all(U.field == k)
+        assert np.all(U.field0 == k - 1)
+
+
+def test_level_setters_copy_values(U):
+    U.update(np.ones(10))
+    field0 = U.field0
+    values = np.full(10, 7.)
+    U.field0 = values
+    assert np.shares_memory(U.field0, field0)
+    values[...] = 0.
+    assert np.all(U.field0 == 7.)
+
+
+def test_next_field_is_same_array_at_every_step(U):
+    nextField = U.nextField
+    for k in range(4):
+        U.update(np.full(10, float(k)))
+        assert np.shares_memory(U.nextField, nextField)
+
+
+def test_in_place_operators_write_values_and_bump_version(U):
+    values = U.field
+    version = U._version
+    U += 1.
+    U *= 3.
+    assert U.field is values
+    assert np.all(U.field == 3.)
+    assert U._version == version + 2
+
+
+def test_out_writes_into_field(U):
+    V = U.clone("V")
+    W = U.clone("W")
+    U.update(np.full(10, 2.))
+    V.update(np.arange(10.))
+    values = W.field
+    version = W._version
+    result = np.multiply(U, V, out=W)
+    assert result is W
+    assert W.field is values
+    assert np.array_equal(W.field, 2. * np.arange(10.))
+    assert W._version == version + 1
+
+
+def test_surface_field_in_place_bumps_version(U):
+    U.update(np.ones(10))
+    phi = fv.surfaceField("phi", U.mesh, U)
+    values = phi.phi
+    version = phi._version
+    phi *= 2.
+    assert phi.phi is values
+    assert np.all(phi.phi[1:-1] == 2.)
+    assert phi._version == version + 1
+
+
+def test_comparisons_are_elementwise(U):
+    V = U.clone("V")
+    V.update(np.arange(10.))
+    assert np.array_equal(U == V, np.arange(10.) == 0.)
+    assert np.array_equal(U != V, np.arange(10.) != 0.)
+    assert np.array_equal(U < V, np.arange(10.) > 0.)
+    assert np.array_equal(U >= V, np.arange(10.) == 0.)
+
+
+def test_fields_hash_by_identity(U):
+    V = U.clone("V")
+    table = {U: "U", V: "V"}
+    assert table[U] == "U" and table[V] == "V"
+    assert len({U, V, U}) == 2
+
+
+def test_cached_recomputes_after_in_place_operator(U):
+    calls = []
+    def compute(field):
+        calls.append(1)
+        return 2. * field.field
+    assert np.all(U.cached("double", compute) == 0.)
+    U.cached("double", compute)
+    assert len(calls) == 1
+    U += 1.
+    assert np.all(U.cached("double", compute) == 2.)
+    np.add(U, 1., out=U)
+    assert np.all(U.cached("double", compute) == 4.)
+    assert len(calls) == 3
+
+
+def countingCompute(calls):
+    def compute(field):
+        calls.append(1)
+        return np.copy(field.field)
+    return compute
+
+
+def test_cached_is_not_recomputed_without_changes(U):
+    calls = []
+    compute = countingCompute(calls)
+    first = U.cached("values", compute)
+    U.field0
+    U.nextField
+    assert U.cached("values", compute) is first
+    assert len(calls) == 1
+    with pytest.raises(ValueError):
+        first[0] = 1.
+
+
+def test_cached_recomputes_after_update(U):
+    calls = []
+    compute = countingCompute(calls)
+    U.cached("values", compute)
+    U.update(np.ones(10))
+    assert np.all(U.cached("values", compute) == 1.)
+    assert len(calls) == 2
+
+
+def test_cached_recomputes_after_boundary_update(makeMesh):
+    mesh = makeMesh(np.linspace(0., 1., 11))
+    bc = {"type":"fixedValue", "value":0.}
+    U = fv.fvField("U", mesh, mesh.time, values=np.zeros(10),
+                   bc0=bc, bcN=dict(bc))
+    calls = []
+    def compute(field):
+        calls.append(1)
+        return fvTools._gradFaces(field)
+    assert U.cached("gradFaces", compute)[-1] == 0.
+    U.bcN.update(1.)
+    assert U.cached("gradFaces", compute)[-1] == pytest.approx(20.)
+    U.bc0.update(1.)
+    assert U.cached("gradFaces", compute)[0] == pytest.approx(-20.)
+    assert len(calls) == 3
+
+
+def test_cached_recomputes_after_mesh_motion(makeMesh):
+    mesh = makeMesh(np.linspace(0., 1., 11), meshType=fv.dynamicFvMesh)
+    U = fv.fvField("U", mesh, mesh.time, values=mesh.Xcells.copy())
+    calls = []
+    def compute(field):
+        calls.append(1)
+        return fvTools._gradFaces(field)
+    before = U.cached("gradFaces", compute)
+    mesh.time.loop()
+    mesh.meshMotion(0., 0.1)
+    after = U.cached("gradFaces", compute)
+    assert len(calls) == 2
+    assert not np.allclose(after[1:-1], before[1:-1])
+    assert np.allclose(after, fvTools._gradFaces(U))
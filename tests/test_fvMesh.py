@@ -0,0 +1,26 @@
+import numpy as np
+
+from finVols1D import fv
+
+
+def assertMetrics(mesh):
+    Xc, Xf, dX = mesh.Xcells, mesh.Xfaces, mesh.dX
+    assert np.allclose(mesh.invDX, 1. / dX)
+    assert np.allclose(mesh.dXcc, np.diff(Xc))
+    assert np.allclose(mesh.invDXcc, 1. / np.diff(Xc))
+    assert np.allclose(mesh.wInterp, dX[:-1] / (dX[1:] + dX[:-1]))
+    assert np.allclose(mesh.dXlow, Xc - Xf[:-1])
+    assert np.allclose(mesh.dXup, Xf[1:] - Xc)
+
+
+def test_metrics_follow_mesh_motion(makeMesh):
+    mesh = makeMesh(np.linspace(0., 1., 21)**2, meshType=fv.dynamicFvMesh)
+    time = mesh.time
+    assertMetrics(mesh)
+    version = mesh._version
+    for k in range(3):
+        time.loop()
+        mesh.meshMotion(0.02, -0.01)
+        assertMetrics(mesh)
+        assert mesh._version > version
+        version = mesh._version
@@ -0,0 +1,132 @@
+import numpy as np
+import pytest
+
+from finVols1D import fv
+
+
+def makeDiffusion(makeMesh, n=21, cyclic=False, time=None):
+    mesh = makeMesh(np.linspace(0., 1., n+1)**1.2, time)
+    time = mesh.time
+    if cyclic:
+        bc0 = bcN = {"type":"cyclic"}
+    else:
+        bc0 = {"type":"fixedValue", "value":0.}
+        bcN = {"type":"fixedValue", "value":1.}
+    U = fv.fvField("U", mesh, time, values=np.sin(2*np.pi*mesh.Xcells),
+                   bc0=bc0, bcN=bcN)
+    D = fv.fvField("D", mesh, time, values=0.1 + mesh.Xcells)
+    diff = fv.surfaceField("D", mesh, D)
+    return mesh, time, U, diff
+
+
+@pytest.mark.parametrize("method", ["picard", "newton"])
+@pytest.mark.parametrize("scheme", ["Euler", "BDF2", "CrankNicolson"])
+def test_linear_problem_matches_direct_solve(makeMesh, method, scheme):
+    mesh, time, U, diff = makeDiffusion(makeMesh)
+    Uref = U.clone()
+    eqn, eqnRef = fv.fvEqn(mesh), fv.fvEqn(mesh)
+    def assemble(eqn, Uiter):
+        eqn.addDdt(U, scheme=scheme)
+        eqn.addLaplacian(diff, U)
+    nonlinear = fv.fvNonlinearSolver(
+        eqn, U, assemble, {"method":method, "tol":1e-12})
+    for k in range(3):
+        time.loop()
+        U.update(nonlinear.solve())
+        eqnRef.addDdt(Uref, scheme=scheme)
+        eqnRef.addLaplacian(diff, Uref)
+        Uref.update(eqnRef.solve())
+        eqnRef.reset()
+        assert nonlinear.finalResidual <= 1e-12
+        assert np.allclose(U.field, Uref.field, rtol=0., atol=1e-12)
+
+
+def makeBurgers(makeMesh, n, cyclic, time=None):
+    """advection by the solved velocity and diffusivity depending on it"""
+    mesh, time, U, diff = makeDiffusion(makeMesh, n, cyclic, time)
+    U.field = 1. + 0.2 * np.sin(2*np.pi*mesh.Xcells) + 0.1 * mesh.Xcells
+    Uiter = U.clone()
+    phiU = fv.surfaceField("u", mesh, Uiter)
+    def assemble(eqn, Uiter):
+        phiU.update(Uiter)
+        eqn.addDdt(U)
+        eqn.addDiv(phiU, U, scheme="linearUpwind")
+        if not cyclic:
+            # laplacian is not available with cyclic boundaries
+            eqn.addLaplacian(phiU, U)
+    return mesh, time, U, Uiter, assemble
+
+
+@pytest.mark.parametrize("cyclic", [False, True])
+@pytest.mark.parametrize("n", [20, 22])
+def test_newton_jacobian_matches_finite_differences(makeMesh, n, cyclic):
+    mesh, time, U, Uiter, assemble = makeBurgers(makeMesh, n, cyclic)
+    time.loop()
+    nonlinear = fv.fvNonlinearSolver(
+        fv.fvEqn(mesh), U, assemble, {"method":"newton"})
+    Uiter.field = U.field + 0.05 * np.cos(3*mesh.Xcells)
+    U0 = np.copy(Uiter.field)
+    residual = nonlinear._residual(Uiter)
+    nonlinear._jacobian(Uiter, residual)
+    assert np.array_equal(Uiter.field, U0)
+    ref = np.zeros((n, n))
+    h = 1e-7
+    for j in range(n):
+        Uiter.field = U0 + h * (np.arange(n) == j)
+        ref[:, j] = (nonlinear._residual(Uiter) - residual) / h
+    assert np.allclose(nonlinear._J.toDense(), ref, rtol=1e-5, atol=1e-6)
+
+
+@pytest.mark.parametrize("cyclic", [False, True])
+def test_colours_separate_coupled_cells(cyclic):
+    solver = fv.fvNonlinearSolver.__new__(fv.fvNonlinearSolver)
+    for n in (9, 10, 11):
+        colours = solver._colours(n, cyclic)
+        for colour in np.unique(colours):
+            cells = np.flatnonzero(colours == colour)
+            gaps = np.diff(cells)
+            if cyclic and len(cells) > 1:
+                gaps = np.append(gaps, cells[0] + n - cells[-1])
+            assert np.all(gaps >= 3)
+
+
+@pytest.mark.parametrize("cyclic", [False, True])
+def test_picard_and_newton_converge_to_same_solution(
+        makeTime, makeMesh, cyclic):
+    results = {}
+    for method in ("picard", "newton"):
+        mesh, time, U, Uiter, assemble = makeBurgers(
+            makeMesh, 20, cyclic, makeTime(dt=0.01))
+        time.loop()
+        nonlinear = fv.fvNonlinearSolver(
+            fv.fvEqn(mesh), U, assemble, {"method":method, "tol":1e-12})
+        x = nonlinear.solve(Uiter)
+        assert nonlinear.finalResidual <= 1e-12
+        assert nonlinear.nIter < 20
+        # reported residual is the one of returned values
+        assert nonlinear._norm(nonlinear._residual(Uiter)) <= 1e-12
+        U.update(x)
+        results[method] = (np.copy(U.field), nonlinear.nIter)
+    assert np.allclose(results["picard"][0], results["newton"][0],
+                       rtol=0., atol=1e-10)
+    assert results["newton"][1] < results["picard"][1]
+
+
+def test_max_iter_is_reported(makeMesh, caplog):
+    mesh, time, U, Uiter, assemble = makeBurgers(makeMesh, 20, True)
+    time.loop()
+    nonlinear = fv.fvNonlinearSolver(
+        fv.fvEqn(mesh), U, assemble, {"tol":1e-14, "maxIter":2})
+    with caplog.at_level("WARNING", logger="finVols1D"):
+        nonlinear.solve(Uiter)
+    assert nonlinear.nIter == 2
+    assert nonlinear.finalResidual > 1e-14
+    assert nonlinear.initialResidual > nonlinear.finalResidual
+    assert "did not converge in 2 iterations" in caplog.text
+
+
+@pytest.mark.parametrize("method", ["secant", 1])
+def test_unknown_method_raises(makeMesh, method):
+    mesh, time, U, diff = makeDiffusion(makeMesh)
+    with pytest.raises(ValueError, match="not supported"):
+        fv.fvNonlinearSolver(fv.fvEqn(mesh), U, None, {"method":method})
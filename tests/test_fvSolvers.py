@@ -0,0 +1,110 @@
+import numpy as np
+import pytest
+
+from finVols1D import fv
+from finVols1D.fv.fvMatrices import fvMatrix
+from finVols1D.fv.fvSolvers import fvSolver
+
+
+FACES = np.linspace(0., 1., 41)**1.3
+
+
+def solveCase(mesh, solver=None, cyclic=False, matrix=None):
+    """advection diffusion step on a non uniform mesh"""
+    time = mesh.time
+    bc = {"type":"cyclic"} if cyclic else {"type":"fixedValue", "value":1.}
+    U = fv.fvField(
+        "U", mesh, time, values=np.sin(2*np.pi*mesh.Xcells), bc0=bc, bcN=bc)
+    vel = fv.fvField("vel", mesh, time, values=0.5 + mesh.Xcells)
+    phi = fv.surfaceField("vel", mesh, vel)
+    eqn = fv.fvEqn(mesh, matrix=matrix, solver=solver)
+    time.loop()
+    eqn.addDdt(U)
+    eqn.addDiv(phi, U)
+    if not cyclic:
+        diff = fv.surfaceField("diff", mesh, vel)
+        eqn.addLaplacian(diff, U)
+    return eqn.solve()
+
+
+@pytest.mark.parametrize("cyclic", [False, True])
+@pytest.mark.parametrize("solver", [
+    "thomas", "banded", "sparseDirect",
+    {"type":"sparseDirect", "method":"splu"},
+    {"type":"bicgstab", "preconditioner":"ilu", "tol":1e-12},
+    {"type":"bicgstab", "preconditioner":"jacobi", "tol":1e-12},
+])
+def test_solver_matches_dense(makeMesh, solver, cyclic):
+    if solver != "thomas":
+        pytest.importorskip("scipy")
+    if solver == "banded" and cyclic:
+        pytest.skip("banded solver does not store matrix corners")
+    ref = solveCase(makeMesh(FACES), matrix="dense", cyclic=cyclic)
+    x = solveCase(makeMesh(FACES), solver=solver, cyclic=cyclic)
+    assert np.allclose(x, ref, rtol=1e-9, atol=1e-9)
+
+
+def test_unsupported_storage_raises(makeMesh):
+    with pytest.raises(ValueError):
+        fv.fvEqn(makeMesh(np.linspace(0., 1., 11)),
+                 matrix="dense", solver="thomas")
+
+
+def test_batch_rejected_by_single_system_solver(makeMesh):
+    mesh = makeMesh(np.linspace(0., 1., 11), meshType=fv.batchFvMesh,
+                    nColumns=3)
+    with pytest.raises(ValueError, match="batch"):
+        fv.fvEqn(mesh, solver="banded")
+
+
+@pytest.mark.parametrize("solver", ["dense", "thomas"])
+def test_batch_solver_matches_columns(makeMesh, solver):
+    faces = np.linspace(0., 1., 21)
+    mesh = makeMesh(faces, meshType=fv.batchFvMesh, nColumns=3)
+    x = solveCase(mesh, solver=solver)
+    assert x.shape == (3, 20)
+    ref = solveCase(makeMesh(faces), matrix="dense")
+    assert np.allclose(x, ref[None, :], rtol=1e-12, atol=1e-12)
+
+
+def test_tridiagonal_to_dense_batch():
+    Amat = fvMatrix.create("cyclicTridiagonal", 4, (2,))
+    Amat.addDiag(np.array([[1., 2., 3., 4.], [5., 6., 7., 8.]]))
+    Amat.addDiag(-np.ones(3), k=1)
+    Amat.lower[..., 0] = 9.
+    A = Amat.toDense()
+    assert A.shape == (2, 4, 4)
+    x = np.arange(8.).reshape(2, 4)
+    assert np.allclose((A @ x[..., None])[..., 0], Amat.matvec(x))
+
+
+def test_unknown_solver_raises():
+    with pytest.raises(ValueError):
+        fvSolver.create("unknown")
+
+
+@pytest.mark.parametrize("cyclic", [False, True])
+@pytest.mark.parametrize("options", [
+    {}, {"matrix":"dense"}, {"cacheFactorization":True},
+])
+def test_solve_into_next_field(makeMesh, options, cyclic):
+    mesh = makeMesh(FACES)
+    time = mesh.time
+    bc = {"type":"cyclic"} if cyclic else {"type":"fixedValue", "value":1.}
+    U = fv.fvField(
+        "U", mesh, time, values=np.sin(2*np.pi*mesh.Xcells), bc0=bc, bcN=bc)
+    vel = fv.fvField("vel", mesh, time, values=0.5 + mesh.Xcells)
+    phi = fv.surfaceField("vel", mesh, vel)
+    eqn = fv.fvEqn(mesh, **options)
+    for k in range(3):
+        time.loop()
+        eqn.addDdt(U)
+        eqn.addDiv(phi, U)
+        ref = np.copy(eqn.solve())
+        out = U.nextField
+        x = eqn.solve(out=out)
+        assert x is out
+        assert np.allclose(x, ref, rtol=1e-12, atol=1e-12)
+        U.update(x)
+        eqn.reset()
+    assert np.allclose(U.field, ref, rtol=1e-12, atol=1e-12)
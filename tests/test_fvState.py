@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from finVols1D import fv
+from finVols1D.fieldIO import checkpoint
+
+
+def makeCase(makeMesh, layout):
+    mesh = makeMesh(np.linspace(0., 1., 11)**1.5)
+    time = mesh.time
+    U = fv.fvField("U", mesh, time, values=np.sin(mesh.Xcells),
+                   bc0={"type":"fixedValue", "value":0.})
+    C = fv.fvField("C", mesh, time, values=1. + mesh.Xcells)
+    phi = fv.surfaceField("phiU", mesh, U)
+    state = fv.fvState([U, C], [phi], layout=layout)
+    return time, mesh, U, C, phi, state
+
+
+def assertAliased(state, U, C, phi):
+    assert np.shares_memory(U.field, state.buffer)
+    assert np.shares_memory(C.field, state.buffer)
+    assert np.shares_memory(phi.phi, state.buffer)
+    assert np.array_equal(state["U"], U.field)
+    assert np.array_equal(state["C"], C.field)
+    assert np.array_equal(state["phiU"], phi.phi)
+
+
+@pytest.mark.parametrize("layout", ["SoA", "AoS"])
+def test_fields_are_views_into_buffer(makeMesh, layout):
+    time, mesh, U, C, phi, state = makeCase(makeMesh, layout)
+    assertAliased(state, U, C, phi)
+    assert np.allclose(U.field, np.sin(mesh.Xcells))
+    assert np.allclose(C.field, 1. + mesh.Xcells)
+    if layout == "AoS":
+        assert state.buffer.shape == (mesh.nCells + 1, 3)
+        assert np.all(state.buffer[-1, :2] == 0.)
+
+
+@pytest.mark.parametrize("layout", ["SoA", "AoS"])
+def test_update_and_restore_keep_views(makeMesh, layout):
+    time, mesh, U, C, phi, state = makeCase(makeMesh, layout)
+    snap = state.snapshot()
+    norm = state.norm()
+    time.loop()
+    U.update(2. * U.field)
+    phi.update(U)
+    assertAliased(state, U, C, phi)
+    assert np.allclose(U.field0, snap[:mesh.nCells] if layout == "SoA"
+                       else snap[:-1, 0])
+    version = phi._version
+    state.restore(snap)
+    assertAliased(state, U, C, phi)
+    assert phi._version > version
+    assert np.array_equal(state.buffer, snap)
+    assert state.norm() == norm
+
+
+@pytest.mark.parametrize("layout", ["SoA", "AoS"])
+def test_checkpoint_read_keeps_views(makeMesh, tmp_path, layout):
+    time, mesh, U, C, phi, state = makeCase(makeMesh, layout)
+    path = str(tmp_path / "case.npz")
+    cp = checkpoint(path, time, [U, C, phi], mesh=mesh)
+    time.loop()
+    U.update(3. * U.field)
+    phi.update(U)
+    cp.write()
+    written = state.snapshot()
+    field0 = np.copy(U.field0)
+    time.loop()
+    U.update(np.zeros(mesh.nCells))
+    C.update(np.zeros(mesh.nCells))
+    phi.phi[...] = 0.
+    cp.read()
+    assertAliased(state, U, C, phi)
+    assert np.array_equal(state.buffer, written)
+    assert np.array_equal(U.field0, field0)
+
+
+def test_state_rejects_bad_input(makeMesh):
+    time, mesh, U, C, phi, state = makeCase(makeMesh, "SoA")
+    with pytest.raises(ValueError):
+        fv.fvState([U], layout="unknown")
+    with pytest.raises(ValueError):
+        fv.fvState([U, U])
+    with pytest.raises(ValueError):
+        fv.fvState()
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from finVols1D import fv
+from finVols1D.fv import fvTools
+
+
+@pytest.fixture
+def mesh(makeMesh):
+    # non-uniform mesh, linear interpolation and gradients of a linear
+    # profile are exact only if mesh weights and distances are used
+    return makeMesh(np.linspace(0., 1., 21)**2)
+
+
+def linearField(mesh, a, b, bc0=None, bcN=None):
+    return fv.fvField("U", mesh, mesh.time, values=a * mesh.Xcells + b,
+                      bc0=bc0, bcN=bcN)
+
+
+def test_face_values_of_linear_profile(mesh):
+    bc0 = {"type":"fixedValue", "value":1.}
+    bcN = {"type":"fixedValue", "value":4.}
+    U = linearField(mesh, 3., 1., bc0, bcN)
+    faces = fvTools.getFaceValues(U)
+    assert np.allclose(faces, 3. * mesh.Xfaces + 1., rtol=0., atol=1e-14)
+
+
+def test_face_values_zero_gradient_boundaries(mesh):
+    U = linearField(mesh, 3., 1.)
+    faces = fvTools.getFaceValues(U)
+    assert faces[0] == U.field[0]
+    assert faces[-1] == U.field[-1]
+
+
+def test_grad_faces_fixed_value_boundaries(mesh):
+    bc0 = {"type":"fixedValue", "value":1.}
+    bcN = {"type":"fixedValue", "value":4.}
+    U = linearField(mesh, 3., 1., bc0, bcN)
+    grad = fvTools.getGradFaces(U)
+    assert grad.shape == mesh.Xfaces.shape
+    assert np.allclose(grad, 3., rtol=0., atol=1e-12)
+
+
+def test_grad_faces_fixed_gradient_boundaries(mesh):
+    bc0 = {"type":"fixedGradient", "value":-2.}
+    bcN = {"type":"fixedGradient", "value":5.}
+    U = linearField(mesh, 3., 1., bc0, bcN)
+    grad = fvTools.getGradFaces(U)
+    assert np.allclose(grad[1:-1], 3., rtol=0., atol=1e-12)
+    assert grad[0] == -2.
+    assert grad[-1] == 5.
+
+
+def test_grad_faces_interior_values(mesh):
+    U = fv.fvField("U", mesh, mesh.time, values=mesh.Xcells**2)
+    grad = fvTools.getGradFaces(U)
+    expected = (U.field[1:] - U.field[:-1]) / np.diff(mesh.Xcells)
+    assert np.allclose(grad[1:-1], expected, rtol=1e-14, atol=0.)
+    assert grad[0] == 0. and grad[-1] == 0.
+
+
+def test_grad_faces_cyclic_boundaries(makeMesh):
+    mesh = makeMesh(np.linspace(0., 1., 11))
+    cyclic = {"type":"cyclic"}
+    U = fv.fvField("U", mesh, mesh.time, values=np.sin(2. * np.pi * mesh.Xcells),
+                   bc0=cyclic, bcN=dict(cyclic))
+    grad = fvTools.getGradFaces(U)
+    expected = (U.field[0] - U.field[-1]) / 0.1
+    assert grad[0] == pytest.approx(expected)
+    assert grad[-1] == pytest.approx(expected)
+
+
+def test_grad_cells_of_linear_profile(mesh):
+    bc0 = {"type":"fixedValue", "value":1.}
+    bcN = {"type":"fixedValue", "value":4.}
+    U = linearField(mesh, 3., 1., bc0, bcN)
+    assert np.allclose(fvTools.getGradCells(U), 3., rtol=0., atol=1e-12)
+
+
+def test_derived_quantities_follow_in_place_changes(mesh):
+    bc0 = {"type":"fixedValue", "value":1.}
+    bcN = {"type":"fixedValue", "value":4.}
+    U = linearField(mesh, 3., 1., bc0, bcN)
+    fvTools.getGradFaces(U)
+    fvTools.getFaceValues(U)
+    U *= 2.
+    U.bc0.update(2.)
+    U.bcN.update(8.)
+    assert np.allclose(fvTools.getGradFaces(U), 6., rtol=0., atol=1e-12)
+    assert np.allclose(fvTools.getFaceValues(U), 6. * mesh.Xfaces + 2.,
+                       rtol=0., atol=1e-14)
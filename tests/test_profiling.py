@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from finVols1D import fv
+from finVols1D.profiling import fvProfiler
+from finVols1D.fv.fvSchemes import divSchemes
+
+
+def test_profiler_labels_each_scheme(makeMesh):
+    mesh = makeMesh(np.linspace(0., 1., 21))
+    time = mesh.time
+    bc = {"type":"fixedValue", "value":0.}
+    schemes = ("upwind", "linearUpwind", "vanLeer", "minmod")
+    fields = [fv.fvField(f"U{k}", mesh, time, values=np.sin(mesh.Xcells),
+                         bc0=bc, bcN=bc) for k in range(len(schemes))]
+    vel = fv.fvField("vel", mesh, time, values=np.ones(mesh.nCells))
+    phi = fv.surfaceField("vel", mesh, vel)
+    eqn = fv.fvEqn(mesh)
+    nSteps = 3
+    with fvProfiler() as prof:
+        for k in range(nSteps):
+            time.loop()
+            for U, scheme in zip(fields, schemes):
+                eqn.addDdt(U)
+                eqn.addDiv(phi, U, scheme=scheme)
+                U.update(eqn.solve())
+                eqn.reset()
+    terms = prof.toDict()["terms"]
+    assert terms["addDiv"]["calls"] == len(schemes) * nSteps
+    assert terms["solve"]["calls"] == len(schemes) * nSteps
+    # parent methods called through super are not counted twice
+    for scheme in schemes:
+        assert terms[f"addDiv:{scheme}"]["calls"] == nSteps
+    assert "addDiv:superbee" not in terms
+    assert terms["addDiv:vanLeer"]["time"] <= terms["addDiv"]["time"]
+    # inherited methods are removed from classes when disabled
+    assert "addDiv" not in vars(divSchemes.vanLeer)
+    assert "addDiv" in vars(divSchemes.upwind)
+    assert not hasattr(divSchemes.upwind.addDiv, "__wrapped__")
+
+
+def test_single_active_profiler():
+    with fvProfiler():
+        with pytest.raises(ValueError):
+            fvProfiler().enable()
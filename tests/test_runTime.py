@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from finVols1D import fv
+from finVols1D.fieldIO import fieldWriter, fieldReader
+
+
+def runAdvection(path, time, velocity=1.):
+    """upwind advection of a bump with adaptive time step"""
+    mesh = fv.fvMesh(np.linspace(0., 1., 51), time)
+    U = fv.fvField(
+        "U", mesh, time, values=np.exp(-100*(mesh.Xcells - 0.3)**2),
+        bc0={"type":"cyclic"}, bcN={"type":"cyclic"})
+    vel = fv.fvField("vel", mesh, time, values=velocity*np.ones(mesh.nCells))
+    phi = fv.surfaceField("vel", mesh, vel)
+    time.addFlux(phi)
+    fieldWriter(path, time, [U])
+    eqn = fv.fvEqn(mesh)
+    dts = []
+    while time.loop():
+        dts.append(time.time - time.time_1)
+        eqn.addDdt(U)
+        eqn.addDiv(phi, U)
+        U.update(eqn.solve())
+        eqn.reset()
+    return time, fieldReader(path), np.array(dts)
+
+
+def test_adaptive_dt_keeps_save_interval(makeTime, tmp_path):
+    # initial time step larger than dtSave must not coarsen output
+    time, reader, dts = runAdvection(tmp_path, makeTime(
+        dt=0.3, dtSave=0.125, adjustTimeStep=True, maxCo=0.5))
+    assert len(reader) == 9
+    assert np.allclose(reader.times, 0.125 * np.arange(9))
+    assert np.max(dts) <= 0.5 * 0.02 * (1 + 1e-12)
+
+
+def test_adaptive_dt_lands_on_save_times_without_sliver_steps(
+        makeTime, tmp_path):
+    # save times accumulated as a sum of dtSave reach 0.9999999999999998
+    time, reader, dts = runAdvection(tmp_path, makeTime(
+        dt=0.01, dtSave=0.1, adjustTimeStep=True, maxCo=0.7))
+    assert len(reader) == 11
+    assert np.allclose(reader.times, 0.1 * np.arange(11), rtol=0., atol=1e-12)
+    assert np.min(dts) > 1e-3
+    assert time.time == 1.
+
+
+def test_fixed_dt_save_times(makeTime, tmp_path):
+    time, reader, dts = runAdvection(
+        tmp_path, makeTime(dt=0.01, dtSave=0.1), velocity=0.5)
+    assert np.allclose(reader.times[:11], 0.1 * np.arange(11), atol=1e-9)
+    assert np.allclose(dts, 0.01)
+
+
+def test_adaptive_dt_splits_save_interval_evenly(makeTime, tmp_path):
+    # Courant limited dt is 0.014, each save interval takes 8 steps
+    time, reader, dts = runAdvection(tmp_path, makeTime(
+        dt=0.01, dtSave=0.1, adjustTimeStep=True, maxCo=0.7))
+    assert len(reader) == 11
+    assert len(dts) <= 82
+    assert np.all(dts <= 0.7 * 0.02 * (1 + 1e-12))
+    # after the initial growth, steps stay close to the Courant limit
+    assert np.all(dts[5:] > 0.8 * 0.7 * 0.02)
+
+
+def test_adaptive_dt_without_flux_or_maxDt_raises(makeTime):
+    time = makeTime(adjustTimeStep=True)
+    with pytest.raises(ValueError, match="addFlux"):
+        time.loop()
+    time = makeTime(dt=0.01, adjustTimeStep=True, maxDt=0.05)
+    dts = []
+    while time.loop():
+        dts.append(time.time - time.time_1)
+    assert max(dts) <= 0.05 * (1 + 1e-12)
+    assert time.time == 1.
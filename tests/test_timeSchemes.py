@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from finVols1D import fv
+
+
+def runDiffusion(makeTime, dt, scheme):
+    """heat equation integrated up to t = 0.1 with a fixed time step"""
+    time = makeTime(dt=dt)
+    mesh = fv.fvMesh(np.linspace(0., 1., 51), time)
+    bc = {"type":"fixedValue", "value":0.}
+    U = fv.fvField("U", mesh, time, values=np.sin(np.pi*mesh.Xcells),
+                   bc0=bc, bcN=bc)
+    D = fv.fvField("D", mesh, time, values=np.ones(mesh.nCells))
+    diff = fv.surfaceField("D", mesh, D)
+    eqn = fv.fvEqn(mesh)
+    for k in range(round(0.1 / dt)):
+        time.loop()
+        eqn.addDdt(U, scheme=scheme)
+        eqn.addLaplacian(diff, U)
+        U.update(eqn.solve())
+        eqn.reset()
+    assert time.time == pytest.approx(0.1)
+    return U.field
+
+
+@pytest.fixture(scope="module")
+def reference(makeTime):
+    return runDiffusion(makeTime, 1e-4, "CrankNicolson")
+
+
+@pytest.mark.parametrize("scheme, order", [
+    ("Euler", 1), ("BDF2", 2), ("CrankNicolson", 2),
+])
+def test_temporal_order(makeTime, reference, scheme, order):
+    errors = [np.abs(runDiffusion(makeTime, dt, scheme) - reference).max()
+              for dt in (0.01, 0.005, 0.0025)]
+    rates = np.log2(np.array(errors[:-1]) / np.array(errors[1:]))
+    assert np.all(rates > order - 0.25)
+    assert np.all(rates < order + 0.5)
+
+
+@pytest.mark.parametrize("scheme", ["RK4", 2])
+def test_unknown_scheme_raises(makeMesh, scheme):
+    mesh = makeMesh(np.linspace(0., 1., 11))
+    U = fv.fvField("U", mesh, mesh.time, values=np.zeros(10))
+    mesh.time.loop()
+    with pytest.raises(ValueError, match="time scheme not supported"):
+        fv.fvEqn(mesh).addDdt(U, scheme=scheme)
@@ -3,9 +3,13 @@ import matplotlib.pyplot as plt
 
 from finVols1D import fv
 from finVols1D.runTime import runTime
+from finVols1D.log import setLogLevel
 
 plt.rcParams["font.size"] = 15
 
+# print Courant numbers every 10 time steps
+setLogLevel("INFO", interval=10)
+
 
 # physical parameters
 ws = -0.01  # settling velocity
@@ -47,21 +51,18 @@ phiWs = fv.surfaceField("ws", mesh, wsField)
 CsMass = [np.sum(mesh.dX * CsField.field)]
 massOut = [0.]
 
-# prepare equations to solve
-CsEqn = fv.fvEqn(mesh)
+# prepare equations to solve, terms are declared once
+CsEqn = fv.fvEqnTemplate(mesh, CsField)
+CsEqn.ddt()
+CsEqn.div(phiWs)
 
 while time.loop():
     print(time)
-    CsEqn.addDdt(CsField)
-    CsEqn.addDiv(phiWs, CsField)
-    #CsEqn.addLaplacian(nutFaces, CsField)
     CsField.update(CsEqn.solve())
     # store Cs mass in domain
     CsMass.append(np.sum(mesh.dX * CsField.field))
     # get flux of Cs through bottom boundary
     massOut.append(massOut[-1] - wsField[0] * CsField[0] * time._dt)
-    # clean matrix before next iteration
-    CsEqn.reset()
 
 CsMass = np.array(CsMass)
 massOut = np.array(massOut)
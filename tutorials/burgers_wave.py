@@ -3,9 +3,13 @@ import matplotlib.pyplot as plt
 
 from finVols1D import fv
 from finVols1D.runTime import runTime
+from finVols1D.log import setLogLevel, logger, logStep
 
 plt.rcParams["font.size"] = 15
 
+# log time and residuals of newton iterations at every time step
+setLogLevel("INFO")
+
 # physical parameters
 Lx = 1.  # domain length
 
@@ -13,7 +17,7 @@ Lx = 1.  # domain length
 time = runTime(
     {"startTime":0.,
      "endTime":0.1,
-     "dt":0.001}
+     "dt":0.005}
 )
 
 # create mesh
@@ -29,18 +33,26 @@ Ufield = fv.fvField(
     values = U0
 )
 
-phiU = fv.surfaceField("u", mesh, Ufield)
+# iterate of u within a time step, flux is computed from it
+Uiter = Ufield.clone()
+phiU = fv.surfaceField("u", mesh, Uiter)
 
 # prepare equations to solve
 UEqn = fv.fvEqn(mesh)
 
+def assemble(eqn, Uiter):
+    phiU.update(Uiter)
+    eqn.addDdt(Ufield)
+    eqn.addDiv(phiU, Ufield)
+
+# newton iterations on nonlinear advection term
+nonlinear = fv.fvNonlinearSolver(
+    UEqn, Ufield, assemble, {"method":"newton", "tol":1e-10})
+
 while time.loop():
-    print(time)
-    UEqn.addDdt(Ufield)
-    UEqn.addDiv(phiU, Ufield)
-    Ufield.update(UEqn.solve())
-    phiU.update(Ufield)
-    UEqn.reset()
+    if logStep(time):
+        logger.info("%s", time)
+    Ufield.update(nonlinear.solve(Uiter))
 
 
 fig, ax = plt.subplots()
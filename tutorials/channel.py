@@ -70,12 +70,12 @@ phiWs = fv.surfaceField("Ws", mesh, WsField)
 # instantiate turbulence model
 turbulence = turbulenceModels.mixingLength(Ufield, length=Hwater, wall=0)
 
-# turbulent eddy viscosity
+# turbulent eddy viscosity, molecular viscosity keeps it positive
 nut = fv.fvField(
     "nut", mesh, time,
     bc0={"type":"fixedGradient", "value":0.},
     bcN={"type":"fixedGradient", "value":0.},
-    values = turbulence.nut()
+    values = nu + np.abs(turbulence.nut())
     )
 nutFaces = fv.surfaceField("nut", mesh, nut)
 
@@ -90,7 +90,7 @@ diffSed = fv.fvField(
     "diffSed", mesh, time,
     bc0={"type":"fixedGradient", "value":0.},
     bcN={"type":"fixedGradient", "value":0.},
-    values = turbulence.nut()
+    values = nut.field
     )
 diffSedFaces = fv.surfaceField("diffSed", mesh, diffSed)
 
@@ -109,17 +109,18 @@ while time.loop():
     print("\n", time)
     # solve equation for velocity U
     print("solve equation for U")
-    Usource.update(np.ones(mesh.nCells) * (Uobj-Ufield.field))
+    np.subtract(Uobj, Ufield, out=Usource)
+    Usource *= mesh.dX  # source is integrated over cells
     UEqn.addDdt(Ufield)
     UEqn.addLaplacian(nutFaces, Ufield)
     UEqn.addSource(Usource)
     Ufield.update(UEqn.solve())
     UEqn.reset()
-    nut.update(turbulence.nut())
+    nut.update(nu + np.abs(turbulence.nut()))
     nutFaces.update(nut)
     # solve suspended load
     print("solve equation for Cs")
-    diffSed.update(turbulence.nut())
+    diffSed.update(nut.field)
     diffSedFaces.update(diffSed)
     gradU = fv.fvTools.getGradCells(Ufield)
     uf = np.sqrt(nu * gradU[0])
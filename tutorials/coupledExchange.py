@@ -0,0 +1,112 @@
+"""
+Diffusion of two species exchanging mass with a fast reaction
+A <-> B, solved as a coupled system in one block tridiagonal matrix
+and compared with segregated solves where the other species is lagged
+"""
+
+import numpy as np
+import matplotlib.pyplot as plt
+
+from finVols1D import fv
+from finVols1D.runTime import runTime
+
+plt.rcParams["font.size"] = 15
+
+# physical parameters
+Lx = 1.  # domain length
+diffA = 1e-2  # diffusivity of species A
+diffB = 1e-3  # diffusivity of species B
+kAB = 50.  # reaction rate from A to B
+kBA = 20.  # reaction rate from B to A
+
+
+def run(dt, coupled):
+    """return final profiles of A and B"""
+    time = runTime(
+        {"startTime":0.,
+         "endTime":1.,
+         "dt":dt,
+         "dtSave":1.}
+    )
+    mesh = fv.fvMesh(np.linspace(0., Lx, 100), time)
+    Afield = fv.fvField(
+        "A", mesh, time,
+        bc0={"type":"fixedValue", "value":1.},
+        bcN={"type":"fixedGradient", "value":0.},
+        values=np.zeros(mesh.nCells))
+    Bfield = fv.fvField(
+        "B", mesh, time,
+        bc0={"type":"fixedGradient", "value":0.},
+        bcN={"type":"fixedGradient", "value":0.},
+        values=np.zeros(mesh.nCells))
+    diffAfield = fv.fvField(
+        "diffA", mesh, time,
+        bc0={"type":"fixedGradient", "value":0.},
+        bcN={"type":"fixedGradient", "value":0.},
+        values=diffA*np.ones(mesh.nCells))
+    diffAFaces = fv.surfaceField("diffA", mesh, diffAfield)
+    diffBfield = fv.fvField(
+        "diffB", mesh, time,
+        bc0={"type":"fixedGradient", "value":0.},
+        bcN={"type":"fixedGradient", "value":0.},
+        values=diffB*np.ones(mesh.nCells))
+    diffBFaces = fv.surfaceField("diffB", mesh, diffBfield)
+
+    if coupled:
+        eqn = fv.fvCoupledEqn(mesh, [Afield, Bfield])
+        while time.loop():
+            eqn.eqn(Afield).addDdt(Afield)
+            eqn.eqn(Afield).addLaplacian(diffAFaces, Afield)
+            eqn.eqn(Bfield).addDdt(Bfield)
+            eqn.eqn(Bfield).addLaplacian(diffBFaces, Bfield)
+            # reaction terms, integrated over cells
+            eqn.addCoupling(Afield, Afield, -kAB*mesh.dX)
+            eqn.addCoupling(Afield, Bfield, kBA*mesh.dX)
+            eqn.addCoupling(Bfield, Bfield, -kBA*mesh.dX)
+            eqn.addCoupling(Bfield, Afield, kAB*mesh.dX)
+            A, B = eqn.solve()
+            Afield.update(A)
+            Bfield.update(B)
+            eqn.reset()
+    else:
+        AEqn = fv.fvEqn(mesh)
+        BEqn = fv.fvEqn(mesh)
+        sourceA = fv.fvField("sourceA", mesh, time, values=np.zeros(mesh.nCells))
+        sourceB = fv.fvField("sourceB", mesh, time, values=np.zeros(mesh.nCells))
+        while time.loop():
+            # other species is taken at previous time step
+            sourceA.update(kBA*mesh.dX*Bfield.field)
+            AEqn.addDdt(Afield)
+            AEqn.addLaplacian(diffAFaces, Afield)
+            AEqn._Amat.addDiag(kAB*mesh.dX)
+            AEqn.addSource(sourceA)
+            sourceB.update(kAB*mesh.dX*Afield.field)
+            BEqn.addDdt(Bfield)
+            BEqn.addLaplacian(diffBFaces, Bfield)
+            BEqn._Amat.addDiag(kBA*mesh.dX)
+            BEqn.addSource(sourceB)
+            Afield.update(AEqn.solve())
+            Bfield.update(BEqn.solve())
+            AEqn.reset()
+            BEqn.reset()
+    return mesh.Xcells, Afield.field, Bfield.field
+
+
+X, Aref, Bref = run(1e-3, coupled=True)
+_, Acpl, Bcpl = run(0.05, coupled=True)
+_, Aseg, Bseg = run(0.05, coupled=False)
+print(f"coupled, dt=0.05, max error: {np.max(np.abs(Acpl-Aref)):.3e}")
+print(f"segregated, dt=0.05, max error: {np.max(np.abs(Aseg-Aref)):.3e}")
+
+fig, (axA, axB) = plt.subplots(ncols=2, figsize=(10, 5))
+for ax, ref, cpl, seg, name in (
+        (axA, Aref, Acpl, Aseg, "A"), (axB, Bref, Bcpl, Bseg, "B")):
+    ax.plot(X, ref, color="black", label="reference")
+    ax.plot(X, cpl, ls="dashed", label="coupled")
+    ax.plot(X, seg, ls="dotted", label="segregated")
+    ax.set_xlabel("X")
+    ax.set_ylabel(name)
+    ax.grid()
+axA.legend()
+fig.tight_layout()
+plt.show()